@@ -1,12 +1,13 @@
 """The Watchman integration."""
 
+from copy import deepcopy
 from datetime import timedelta
 from dataclasses import dataclass
 from homeassistant.util import dt as dt_util
 from homeassistant.helpers.event import async_track_point_in_utc_time
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryNotReady
 from homeassistant.const import (
     EVENT_HOMEASSISTANT_STARTED,
@@ -23,10 +24,16 @@ from homeassistant.components.homeassistant import (
 
 from .services import WatchmanServicesSetup
 from .coordinator import WatchmanCoordinator
+from .scheduler import ParseScheduler
 from .utils.logger import _LOGGER
+from .utils.parse_cache import ParseCache
+from .utils.parser import apply_ignored_items, get_included_folders
+from .utils.registry import get_registry_table
+from .utils.watcher import FileWatcher
 from .utils.utils import (
     get_entry,
     get_config,
+    get_registry_rules,
 )
 
 
@@ -48,16 +55,22 @@ from .const import (
     CONF_STARTUP_DELAY,
     CONF_FRIENDLY_NAMES,
     CONF_SECTION_APPEARANCE_LOCATION,
+    CONF_SECTION_PARSER,
+    CONF_PARSER_WATCH_FILES,
+    CONF_PARSER_BACKGROUND_RESCAN,
     EVENT_AUTOMATION_RELOADED,
     EVENT_SCENE_RELOADED,
     HASS_DATA_CANCEL_HANDLERS,
     HASS_DATA_COORDINATOR,
+    HASS_DATA_FILES_ENTITY_LIST,
     HASS_DATA_PARSED_ENTITY_LIST,
     HASS_DATA_PARSED_SERVICE_LIST,
+    PREVIEW_IGNORES_SERVICE_NAME,
     REPORT_SERVICE_NAME,
     TRACKED_EVENT_DOMAINS,
     MONITORED_STATES,
     PLATFORMS,
+    RELOAD_OPTIONS,
     VERSION,
 )
 
@@ -70,8 +83,9 @@ class WMData:
     """Watchman runtime data."""
 
     coordinator: WatchmanCoordinator
-    force_parsing: bool
-    parse_reason: str | None
+    scheduler: ParseScheduler
+    # options the integration runs with, to find changed ones on update
+    options: dict
 
 
 async def async_setup_entry(hass: HomeAssistant, config_entry: WMConfigEntry):
@@ -82,9 +96,11 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: WMConfigEntry):
 
     coordinator = WatchmanCoordinator(hass, _LOGGER, name=config_entry.title)
     # parsing shouldn't occur if HA is not running yet
+    scheduler = ParseScheduler(hass, coordinator)
     config_entry.runtime_data = WMData(
-        coordinator, force_parsing=False, parse_reason=None
+        coordinator, scheduler, deepcopy(dict(config_entry.data))
     )
+    config_entry.async_on_unload(scheduler.stop)
 
     hass.data[DOMAIN_DATA] = {"config_entry_id": config_entry.entry_id}
     hass.data.setdefault(DOMAIN, {})[config_entry.entry_id] = coordinator
@@ -107,8 +123,29 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: WMConfigEntry):
 
 
 async def update_listener(hass: HomeAssistant, entry: ConfigEntry):
-    """Reload integration when options changed."""
-    await hass.config_entries.async_reload(entry.entry_id)
+    """Apply changed options.
+
+    Integration is reloaded and files are parsed again only if RELOAD_OPTIONS
+    changed. Changed ignored items filter references of the last parse again,
+    other options take effect on the next sensors refresh or report.
+    """
+    applied_options = entry.runtime_data.options
+    entry.runtime_data.options = deepcopy(dict(entry.data))
+    changed_options = {
+        key
+        for key in entry.data.keys() | applied_options.keys()
+        if entry.data.get(key) != applied_options.get(key)
+    }
+    _LOGGER.debug(f"::update_listener:: Changed options: {sorted(changed_options)}")
+    if changed_options.intersection(RELOAD_OPTIONS):
+        await hass.config_entries.async_reload(entry.entry_id)
+        return
+    if (
+        CONF_IGNORED_ITEMS in changed_options
+        and HASS_DATA_FILES_ENTITY_LIST in hass.data[DOMAIN]
+    ):
+        apply_ignored_items(hass)
+    await entry.runtime_data.coordinator.async_refresh()
 
 
 async def async_unload_entry(hass: HomeAssistant, config_entry):  # pylint: disable=unused-argument
@@ -119,6 +156,8 @@ async def async_unload_entry(hass: HomeAssistant, config_entry):  # pylint: disa
 
     if hass.services.has_service(DOMAIN, REPORT_SERVICE_NAME):
         hass.services.async_remove(DOMAIN, REPORT_SERVICE_NAME)
+    if hass.services.has_service(DOMAIN, PREVIEW_IGNORES_SERVICE_NAME):
+        hass.services.async_remove(DOMAIN, PREVIEW_IGNORES_SERVICE_NAME)
 
     unload_ok = await hass.config_entries.async_unload_platforms(
         config_entry, PLATFORMS
@@ -137,6 +176,11 @@ async def async_unload_entry(hass: HomeAssistant, config_entry):  # pylint: disa
     return unload_ok
 
 
+async def async_remove_entry(hass: HomeAssistant, config_entry):  # pylint: disable=unused-argument
+    """Remove persistent data when integration is deleted."""
+    await ParseCache(hass).async_remove()
+
+
 async def add_event_handlers(hass: HomeAssistant):
     """Add event handlers."""
 
@@ -150,13 +194,21 @@ async def add_event_handlers(hass: HomeAssistant):
         """Refresh sensors state."""
         hass.data.get(DOMAIN_DATA)
         entry = get_entry(hass)
-        entry.runtime_data.force_parsing = True
-        entry.runtime_data.parse_reason = "HA restart"
-        await entry.runtime_data.coordinator.async_refresh()
+        entry.runtime_data.scheduler.async_request("HA restart", delay=0)
 
     async def async_on_home_assistant_started(event):  # pylint: disable=unused-argument
         startup_delay = get_config(hass, CONF_STARTUP_DELAY, 0)
         await async_schedule_refresh_states(hass, startup_delay)
+        if watcher:
+            await watcher.async_start()
+        if rescans:
+            coordinator.async_start_rescans(async_on_files_changed)
+
+    async def async_on_files_changed(changed_files):
+        """Parse configuration files changed on disk."""
+        get_entry(hass).runtime_data.scheduler.async_request(
+            "configuration files changed", changed_files=changed_files
+        )
 
     async def async_on_configuration_changed(event):
         entry = get_entry(hass)
@@ -169,14 +221,15 @@ async def add_event_handlers(hass: HomeAssistant):
                 SERVICE_RELOAD,
                 SERVICE_RELOAD_ALL,
             ]:
-                entry.runtime_data.force_parsing = True
-                entry.runtime_data.parse_reason = f"{domain}.{service} call"
-                await entry.runtime_data.coordinator.async_refresh()
+                entry.runtime_data.scheduler.async_request(f"{domain}.{service} call")
 
         elif event_type in [EVENT_AUTOMATION_RELOADED, EVENT_SCENE_RELOADED]:
-            entry.runtime_data.force_parsing = True
-            entry.runtime_data.parse_reason = f"event: {event_type}"
-            await entry.runtime_data.coordinator.async_refresh()
+            # reloaded automations are taken from memory, while scenes
+            # do not keep their source file, so files are parsed as well
+            entry.runtime_data.scheduler.async_request(
+                f"event: {event_type}",
+                parse_files=event_type == EVENT_SCENE_RELOADED,
+            )
 
     async def async_on_service_changed(event):
         service = f"{event.data['domain']}.{event.data['service']}"
@@ -204,13 +257,45 @@ async def add_event_handlers(hass: HomeAssistant):
                 coordinator = hass.data[DOMAIN][HASS_DATA_COORDINATOR]
                 await coordinator.async_refresh()
 
+    @callback
+    def async_on_registry_changed(entity_id):
+        """Refresh sensors if registry ignore rules may match differently."""
+        if not get_registry_rules(hass):
+            return
+        if entity_id is None or entity_id in hass.data[DOMAIN].get(
+            HASS_DATA_PARSED_ENTITY_LIST, []
+        ):
+            _LOGGER.debug("Registry changed: %s", entity_id or "all entities")
+            hass.async_create_task(coordinator.async_request_refresh())
+
+    watcher = None
+    if get_config(hass, CONF_PARSER_WATCH_FILES):
+        watcher = FileWatcher(
+            hass,
+            get_included_folders(hass),
+            get_config(hass, CONF_IGNORED_FILES, None),
+            async_on_files_changed,
+        )
+
+    # the watcher reports changes as they happen, so rescans are not needed
+    rescans = get_config(hass, CONF_PARSER_BACKGROUND_RESCAN) and not watcher
+    coordinator = hass.data[DOMAIN][HASS_DATA_COORDINATOR]
+
     # hass is not started yet, schedule config parsing once it loaded
     if not hass.is_running:
         hass.bus.async_listen_once(
             EVENT_HOMEASSISTANT_STARTED, async_on_home_assistant_started
         )
+    else:
+        if watcher:
+            await watcher.async_start()
+        if rescans:
+            coordinator.async_start_rescans(async_on_files_changed)
 
     hdlr = []
+    if watcher:
+        hdlr.append(watcher.stop)
+    hdlr.append(coordinator.stop_rescans)
     hdlr.append(
         # track service calls which update HA configuration
         hass.bus.async_listen(EVENT_CALL_SERVICE, async_on_configuration_changed)
@@ -226,12 +311,13 @@ async def add_event_handlers(hass: HomeAssistant):
     )
     hdlr.append(hass.bus.async_listen(EVENT_SERVICE_REMOVED, async_on_service_changed))
     hdlr.append(hass.bus.async_listen(EVENT_STATE_CHANGED, async_on_state_changed))
+    hdlr.extend(get_registry_table(hass).async_listen(async_on_registry_changed))
     hass.data[DOMAIN][HASS_DATA_CANCEL_HANDLERS] = hdlr
 
 
 async def async_migrate_entry(hass, config_entry: ConfigEntry):
     """Migrate ConfigEntry persistent data to a new version."""
-    if config_entry.version > 1:
+    if config_entry.version > CONFIG_ENTRY_VERSION:
         # This means the user has downgraded from a future version
         _LOGGER.error(
             "Unable to migratre Watchman entry from version %d.%d. If integration version was downgraded, use backup to restore its data.",
@@ -239,6 +325,29 @@ async def async_migrate_entry(hass, config_entry: ConfigEntry):
             config_entry.minor_version,
         )
         return False
+    elif config_entry.version == CONFIG_ENTRY_VERSION:
+        # minor version 2 introduced parser options section,
+        # minor versions 3 to 9 added yaml_ast, include_graph,
+        # index_memory_budget, watch_files, git_changes, max_file_size,
+        # file_time_budget and background_rescan options to it
+        data = {**config_entry.data}
+        data[CONF_SECTION_PARSER] = {
+            **deepcopy(DEFAULT_OPTIONS[CONF_SECTION_PARSER]),
+            **data.get(CONF_SECTION_PARSER, {}),
+        }
+        _LOGGER.info(
+            "Successfully migrated Watchman configuration entry from version %d.%d. to version %d.%d",
+            config_entry.version,
+            config_entry.minor_version,
+            CONFIG_ENTRY_VERSION,
+            CONFIG_ENTRY_MINOR_VERSION,
+        )
+        hass.config_entries.async_update_entry(
+            config_entry,
+            data=data,
+            minor_version=CONFIG_ENTRY_MINOR_VERSION,
+        )
+        return True
     else:
         # migrate from ConfigEntry.options to ConfigEntry.data
         _LOGGER.info(
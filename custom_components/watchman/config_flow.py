@@ -13,7 +13,10 @@ from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers import config_validation as cv, selector
 import voluptuous as vol
 import anyio
-from .utils.utils import async_is_valid_path, get_val
+from .utils.estimate import estimate_scan
+from .utils.parser import get_included_folders
+from .utils.registry import parse_registry_rules
+from .utils.utils import async_is_valid_path, get_val, to_lists
 
 from .utils.logger import _LOGGER
 
@@ -29,12 +32,24 @@ from .const import (
     CONF_INCLUDED_FOLDERS,
     CONF_CHECK_LOVELACE,
     CONF_IGNORED_STATES,
+    CONF_IGNORED_REGISTRY,
     CONF_COLUMNS_WIDTH,
     CONF_STARTUP_DELAY,
     CONF_FRIENDLY_NAMES,
     CONF_SECTION_APPEARANCE_LOCATION,
+    CONF_SECTION_PARSER,
+    CONF_PARSER_WORKERS,
+    CONF_PARSER_MEMORY_BUDGET,
+    CONF_PARSER_WATCH_FILES,
+    CONF_PARSER_GIT_CHANGES,
+    CONF_PARSER_MAX_FILE_SIZE,
+    CONF_PARSER_FILE_TIME_BUDGET,
+    CONF_PARSER_BACKGROUND_RESCAN,
+    CONF_PARSER_YAML_AST,
+    CONF_PARSER_INCLUDE_GRAPH,
     MONITORED_STATES,
     DEFAULT_OPTIONS,
+    RELOAD_OPTIONS,
 )
 
 
@@ -61,6 +76,9 @@ def _get_data_schema() -> vol.Schema:
             vol.Optional(
                 CONF_IGNORED_FILES,
             ): select,
+            vol.Optional(
+                CONF_IGNORED_REGISTRY,
+            ): select,
             vol.Required(
                 CONF_STARTUP_DELAY,
             ): cv.positive_int,
@@ -86,6 +104,40 @@ def _get_data_schema() -> vol.Schema:
                 ),
                 {"collapsed": True},
             ),
+            vol.Required(CONF_SECTION_PARSER): data_entry_flow.section(
+                vol.Schema(
+                    {
+                        vol.Required(
+                            CONF_PARSER_WORKERS,
+                        ): cv.positive_int,
+                        vol.Optional(
+                            CONF_PARSER_YAML_AST,
+                        ): cv.boolean,
+                        vol.Optional(
+                            CONF_PARSER_INCLUDE_GRAPH,
+                        ): cv.boolean,
+                        vol.Optional(
+                            CONF_PARSER_MEMORY_BUDGET,
+                        ): cv.positive_int,
+                        vol.Optional(
+                            CONF_PARSER_WATCH_FILES,
+                        ): cv.boolean,
+                        vol.Optional(
+                            CONF_PARSER_GIT_CHANGES,
+                        ): cv.boolean,
+                        vol.Optional(
+                            CONF_PARSER_MAX_FILE_SIZE,
+                        ): cv.positive_int,
+                        vol.Optional(
+                            CONF_PARSER_FILE_TIME_BUDGET,
+                        ): cv.positive_int,
+                        vol.Optional(
+                            CONF_PARSER_BACKGROUND_RESCAN,
+                        ): cv.boolean,
+                    }
+                ),
+                {"collapsed": True},
+            ),
         }
     )
 
@@ -110,6 +162,13 @@ async def _async_validate_input(
                 placeholders["path"] = path
                 break
 
+    if CONF_IGNORED_REGISTRY in user_input:
+        try:
+            parse_registry_rules(to_lists(user_input, CONF_IGNORED_REGISTRY))
+        except ValueError as exception:
+            errors[CONF_IGNORED_REGISTRY] = "invalid_ignored_registry"
+            placeholders["rule"] = str(exception)
+
     columns_width = get_val(
         user_input, CONF_COLUMNS_WIDTH, CONF_SECTION_APPEARANCE_LOCATION
     )
@@ -163,6 +222,9 @@ class ConfigFlowHandler(ConfigFlow, domain=DOMAIN):
 class OptionsFlowHandler(OptionsFlow):
     """Options flow used to change configuration (options) of existing instance of integration."""
 
+    # options entered by user, saved once the estimate is confirmed
+    _options: dict[str, Any] | None = None
+
     # def __init__(self, config_entry: ConfigEntry) -> None:
     #    """Handle UI options dialog."""
     # _LOGGER.debug("::OptionsFlowHandler.__init::")
@@ -207,13 +269,20 @@ class OptionsFlowHandler(OptionsFlow):
                 ):
                     user_input[CONF_IGNORED_ITEMS] = ""
 
-                # see met.no code, without update_entry the EXISTING entry
-                # will not be updated with user input, but entry.options will do
-                self.hass.config_entries.async_update_entry(
-                    self.config_entry, data={**self.config_entry.data, **user_input}
-                )
-                # await self.hass.config_entries.async_reload(self.config_entry.entry_id)
-                return self.async_create_entry(title="", data={})
+                if (
+                    CONF_IGNORED_REGISTRY in self.config_entry.data
+                    and CONF_IGNORED_REGISTRY not in user_input
+                ):
+                    user_input[CONF_IGNORED_REGISTRY] = ""
+
+                self._options = {**self.config_entry.data, **user_input}
+                # other options do not change what is parsed
+                if any(
+                    self._options.get(key) != self.config_entry.data.get(key)
+                    for key in RELOAD_OPTIONS
+                ):
+                    return await self.async_step_estimate()
+                return await self.async_step_save()
             else:
                 # in case of errors in user_input, display them in the form
                 # use previous user input as suggested values
@@ -232,10 +301,49 @@ class OptionsFlowHandler(OptionsFlow):
                     description_placeholders=dict(placeholders),
                 )
         # we asked to provide default values for the form
+        # options which were not saved yet if user returned from the estimate
         return self.async_show_form(
             step_id="init",
             data_schema=self.add_suggested_values_to_schema(
                 _get_data_schema(),
-                self.config_entry.data,
+                self._options or self.config_entry.data,
             ),
         )
+
+    async def async_step_estimate(self, user_input=None) -> ConfigFlowResult:  # pylint: disable=unused-argument
+        """Show expected parsing cost of the entered options before saving them.
+
+        Included folders are walked the same way the parser does and a sample
+        of files is parsed to project the parsing time.
+        """
+        max_file_size = get_val(
+            self._options, CONF_PARSER_MAX_FILE_SIZE, CONF_SECTION_PARSER
+        )
+        estimate = await self.hass.async_add_executor_job(
+            estimate_scan,
+            get_included_folders(self.hass, self._options),
+            to_lists(self._options, CONF_IGNORED_FILES),
+            get_val(self._options, CONF_PARSER_YAML_AST, CONF_SECTION_PARSER),
+            max_file_size * 1024,
+        )
+        _LOGGER.debug(f"::OptionsFlowHandler.async_step_estimate:: {estimate}")
+        return self.async_show_menu(
+            step_id="estimate",
+            menu_options=["save", "init"],
+            description_placeholders={
+                "files": str(estimate.files),
+                "size": f"{estimate.size / 1024:.0f}",
+                "skipped": str(estimate.skipped),
+                "duration": f"{estimate.duration:.1f}",
+            },
+        )
+
+    async def async_step_save(self, user_input=None) -> ConfigFlowResult:  # pylint: disable=unused-argument
+        """Save entered options."""
+        # see met.no code, without update_entry the EXISTING entry
+        # will not be updated with user input, but entry.options will do
+        self.hass.config_entries.async_update_entry(
+            self.config_entry, data=self._options
+        )
+        # await self.hass.config_entries.async_reload(self.config_entry.entry_id)
+        return self.async_create_entry(title="", data={})
@@ -7,25 +7,45 @@ DOMAIN_DATA = "watchman_data"
 VERSION = "0.7.0-beta.0"
 
 CONFIG_ENTRY_VERSION = 2
-CONFIG_ENTRY_MINOR_VERSION = 1
+CONFIG_ENTRY_MINOR_VERSION = 9
 
 DEFAULT_REPORT_FILENAME = "watchman_report.txt"
+# root of the include graph of configuration files
+CONFIG_YAML = "configuration.yaml"
 DEFAULT_HEADER = "-== WATCHMAN REPORT ==- "
 DEFAULT_CHUNK_SIZE = 3500
 
 PACKAGE_NAME = "custom_components.watchman"
 REPORT_SERVICE_NAME = "report"
+PREVIEW_IGNORES_SERVICE_NAME = "preview_ignores"
 
 HASS_DATA_PARSED_ENTITY_LIST = "entity_list"
 HASS_DATA_PARSED_SERVICE_LIST = "service_list"
 HASS_DATA_FILES_PARSED = "files_parsed"
+HASS_DATA_FILES_ENTITY_LIST = "files_entity_list"
+HASS_DATA_FILES_SERVICE_LIST = "files_service_list"
+HASS_DATA_LOADED_ENTITY_LIST = "loaded_entity_list"
+HASS_DATA_LOADED_SERVICE_LIST = "loaded_service_list"
 HASS_DATA_FILES_IGNORED = "files_ignored"
+HASS_DATA_FOLDERS_IGNORED = "folders_ignored"
+HASS_DATA_FILES_SKIPPED = "files_skipped"
+HASS_DATA_SCANNED_FILES = "scanned_files"
+HASS_DATA_GIT_STATE = "git_state"
+HASS_DATA_FILES_REJECTED = "files_rejected"
+HASS_DATA_IGNORE_MATCHER = "ignore_matcher"
+HASS_DATA_REGISTRY_TABLE = "registry_table"
 HASS_DATA_PARSE_DURATION = "parse_duration"
 HASS_DATA_CANCEL_HANDLERS = "cancel_handlers"
 HASS_DATA_COORDINATOR = "coordinator"
 HASS_DATA_MISSING_ENTITIES = "entities_missing"
 HASS_DATA_MISSING_SERVICES = "services_missing"
 HASS_DATA_CHECK_DURATION = "check_duration"
+HASS_DATA_VALIDATION = "validation"
+HASS_DATA_PARSE_CACHE = "parse_cache"
+
+PARSE_CACHE_STORAGE_KEY = f"{DOMAIN}.parse_cache"
+PARSE_CACHE_STORAGE_VERSION = 3
+PARSE_CACHE_SAVE_DELAY = 10
 
 COORD_DATA_MISSING_ENTITIES = "entities_missing"
 COORD_DATA_MISSING_SERVICES = "services_missing"
@@ -47,6 +67,7 @@ CONF_SERVICE_DATA2 = "service_data"
 CONF_INCLUDED_FOLDERS = "included_folders"
 CONF_CHECK_LOVELACE = "check_lovelace"
 CONF_IGNORED_STATES = "ignored_states"
+CONF_IGNORED_REGISTRY = "ignored_registry"
 CONF_CHUNK_SIZE = "chunk_size"
 CONF_CREATE_FILE = "create_file"
 CONF_SEND_NOTIFICATION = "send_notification"
@@ -65,12 +86,32 @@ CONF_ALLOWED_SERVICE_PARAMS = [
     CONF_SERVICE_DATA,
 ]
 
+# number of matched items returned per rule by watchman.preview_ignores
+PREVIEW_SAMPLE_SIZE = 5
+
 CONF_SECTION_APPEARANCE_LOCATION = "appearance_location_options"
 CONF_SECTION_NOTIFY_ACTION = "notify_action_options"
+CONF_SECTION_PARSER = "parser_options"
+
+CONF_PARSER_WORKERS = "parser_workers"
+CONF_PARSER_YAML_AST = "yaml_ast"
+CONF_PARSER_INCLUDE_GRAPH = "include_graph"
+CONF_PARSER_MEMORY_BUDGET = "index_memory_budget"
+CONF_PARSER_WATCH_FILES = "watch_files"
+CONF_PARSER_GIT_CHANGES = "git_changes"
+CONF_PARSER_MAX_FILE_SIZE = "max_file_size"
+CONF_PARSER_FILE_TIME_BUDGET = "file_time_budget"
+CONF_PARSER_BACKGROUND_RESCAN = "background_rescan"
 
 EVENT_AUTOMATION_RELOADED = "automation_reloaded"
 EVENT_SCENE_RELOADED = "scene_reloaded"
 
+# files of UI managed configuration, their content is taken from memory
+LOADED_CONFIG_FILES = {
+    "automation": "automations.yaml",
+    "scene": "scenes.yaml",
+}
+
 SENSOR_LAST_UPDATE = "watchman_last_updated"
 SENSOR_MISSING_ENTITIES = "watchman_missing_entities"
 SENSOR_MISSING_SERVICES = "watchman_missing_services"
@@ -104,11 +145,59 @@ BUNDLED_IGNORED_ITEMS = [
 # Platforms
 PLATFORMS = [Platform.SENSOR]
 
+DEFAULT_PARSER_WORKERS = 4
+# files to parse are split into batches, so that each worker gets several of them
+PARSER_BATCHES_PER_WORKER = 4
+# files larger than this size (bytes) are memory-mapped instead of being read
+PARSER_MMAP_THRESHOLD = 1024 * 1024
+# files with NUL bytes in the first bytes of this size are skipped as binary
+PARSER_BINARY_SNIFF_SIZE = 8192
+# number of distinct lines which references are memoized by the scanner
+PARSER_LINE_MEMO_SIZE = 8192
+# longer lines (chars) are rarely repeated, they are scanned without the memo
+PARSER_LINE_MEMO_MAX_LENGTH = 512
+# larger files (KiB) are skipped
+DEFAULT_PARSER_MAX_FILE_SIZE = 5120
+# parsing of a file is aborted after this time (seconds)
+DEFAULT_PARSER_FILE_TIME_BUDGET = 10
+# parse cache is dropped when files are parsed in another mode
+PARSER_MODE_TEXT = "text"
+PARSER_MODE_AST = "ast"
+# memory budget of the parsed references index, MiB
+DEFAULT_PARSER_MEMORY_BUDGET = 16
+# occurrences of a reference past this number are only counted per file
+INDEX_MAX_OCCURRENCES = 50
+# changes of watched files are collected for this time (seconds) before parsing
+WATCHER_BATCH_DELAY = 2
+# watched files are polled with this interval (seconds) if inotify is not available
+WATCHER_POLL_INTERVAL = 30
+# background rescans check files which are due with this interval (seconds)
+RESCAN_TICK = 30
+# per-file rescan interval (seconds) adapts to the file change rate within these bounds
+RESCAN_MIN_INTERVAL = 60
+RESCAN_MAX_INTERVAL = 3600
+# initial rescan interval (seconds) of files which are not in RESCAN_HOT_FILES
+RESCAN_COLD_INTERVAL = 900
+# files often changed by HA itself, they start on RESCAN_MIN_INTERVAL
+RESCAN_HOT_FILES = [
+    "*/automations.yaml",
+    "*/scripts.yaml",
+    "*/scenes.yaml",
+    "*/.storage/lovelace*",
+]
+# parse requests are merged until none arrives for this time (seconds)
+PARSE_QUIET_WINDOW = 3
+# number of files parsed to estimate parsing time in the options flow
+ESTIMATE_SAMPLE_FILES = 20
+# git commands which take longer (seconds) are aborted and folders are walked
+GIT_TIMEOUT = 10
+
 DEFAULT_OPTIONS = {
     CONF_INCLUDED_FOLDERS: "/config",
     CONF_IGNORED_ITEMS: "",
     CONF_IGNORED_STATES: [],
     CONF_IGNORED_FILES: "*/blueprints/*, */custom_components/*, */esphome/*",
+    CONF_IGNORED_REGISTRY: "",
     CONF_CHECK_LOVELACE: False,
     CONF_STARTUP_DELAY: 0,
     CONF_SECTION_APPEARANCE_LOCATION: {
@@ -117,8 +206,31 @@ DEFAULT_OPTIONS = {
         CONF_COLUMNS_WIDTH: "30, 8, 60",
         CONF_FRIENDLY_NAMES: False,
     },
+    CONF_SECTION_PARSER: {
+        CONF_PARSER_WORKERS: DEFAULT_PARSER_WORKERS,
+        CONF_PARSER_YAML_AST: False,
+        CONF_PARSER_INCLUDE_GRAPH: False,
+        CONF_PARSER_MEMORY_BUDGET: DEFAULT_PARSER_MEMORY_BUDGET,
+        CONF_PARSER_WATCH_FILES: False,
+        CONF_PARSER_GIT_CHANGES: False,
+        CONF_PARSER_MAX_FILE_SIZE: DEFAULT_PARSER_MAX_FILE_SIZE,
+        CONF_PARSER_FILE_TIME_BUDGET: DEFAULT_PARSER_FILE_TIME_BUDGET,
+        CONF_PARSER_BACKGROUND_RESCAN: False,
+    },
 }
 
+# keys of `key:value` rules which ignore entities by their registry attributes
+REGISTRY_RULE_KEYS = ["label", "area", "integration", "entity_category"]
+
+# changes of these options reload the integration and parse files again,
+# other options are applied in place
+RELOAD_OPTIONS = [
+    CONF_INCLUDED_FOLDERS,
+    CONF_IGNORED_FILES,
+    CONF_CHECK_LOVELACE,
+    CONF_SECTION_PARSER,
+]
+
 # additional domains to detect entities which are not included into
 # homeassistant.const.Platform enum
 DEFAULT_HA_DOMAINS = [
@@ -144,3 +256,10 @@ DEFAULT_HA_DOMAINS = [
 
 # Watchman will ignore lines started from these words followed by :
 PARSER_STOP_WORDS = ["description", "example", "icon", "title"]
+
+# Watchman will not descend into these folders while looking for config files
+PARSER_SKIPPED_FOLDERS = [".git", ".hg", ".svn", "node_modules", "__pycache__"]
+
+# ...and into these ones only if they are right in an included folder,
+# e.g. python packages installed by Home Assistant to /config/deps
+PARSER_SKIPPED_ROOT_FOLDERS = ["deps"]
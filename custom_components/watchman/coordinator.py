@@ -1,10 +1,13 @@
 """Data update coordinator for Watchman."""
 
-import time
-import asyncio
+from collections.abc import Awaitable, Callable
+from datetime import timedelta
+import fnmatch
 from token import INDENT
 from typing import Any
+from homeassistant.core import CALLBACK_TYPE, callback
 from homeassistant.util import dt as dt_util
+from homeassistant.helpers.event import async_track_time_interval
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 
 from .utils.report import fill
@@ -21,17 +24,18 @@ from .const import (
     HASS_DATA_MISSING_SERVICES,
     HASS_DATA_PARSED_ENTITY_LIST,
     HASS_DATA_PARSED_SERVICE_LIST,
+    HASS_DATA_SCANNED_FILES,
+    HASS_DATA_VALIDATION,
+    RESCAN_COLD_INTERVAL,
+    RESCAN_HOT_FILES,
+    RESCAN_MAX_INTERVAL,
+    RESCAN_MIN_INTERVAL,
+    RESCAN_TICK,
 )
-from .utils.utils import (
-    renew_missing_entities_list,
-    renew_missing_actions_list,
-    get_entity_state,
-    get_entry,
-)
+from .utils.utils import get_modified_files
+from .utils.validation import validate
 from .utils.logger import _LOGGER
 
-parser_lock = asyncio.Lock()
-
 
 class WatchmanCoordinator(DataUpdateCoordinator):
     """My custom coordinator."""
@@ -53,6 +57,82 @@ class WatchmanCoordinator(DataUpdateCoordinator):
             COORD_DATA_SERVICE_ATTRS: "",
             COORD_DATA_ENTITY_ATTRS: "",
         }
+        # background rescans: per-file interval and timestamp of the next check
+        self._rescan_intervals: dict[str, float] = {}
+        self._rescan_due: dict[str, float] = {}
+        self._on_files_changed: Callable[[set[str]], Awaitable[None]] | None = None
+        self._cancel_rescans: CALLBACK_TYPE | None = None
+
+    @callback
+    def async_start_rescans(
+        self, on_change: Callable[[set[str]], Awaitable[None]]
+    ) -> None:
+        """Re-check parsed files for changes in background.
+
+        Files are checked by their signature (size, mtime), so only the
+        modified ones are passed to on_change to be parsed again. Files which
+        are often edited by HA itself, like automations.yaml or dashboards,
+        start on a short interval and the rest on a long one, then the interval
+        of a file is halved when it changed and doubled when it did not, within
+        RESCAN_MIN_INTERVAL and RESCAN_MAX_INTERVAL.
+        """
+        self._on_files_changed = on_change
+        self._cancel_rescans = async_track_time_interval(
+            self.hass, self._async_rescan, timedelta(seconds=RESCAN_TICK)
+        )
+
+    @callback
+    def stop_rescans(self) -> None:
+        """Stop background rescans."""
+        if self._cancel_rescans:
+            self._cancel_rescans()
+            self._cancel_rescans = None
+
+    async def _async_rescan(self, now) -> None:
+        """Check files which are due and report modified ones."""
+        scanned_files = self.hass.data[DOMAIN].get(HASS_DATA_SCANNED_FILES)
+        if not scanned_files:
+            return
+        timestamp = now.timestamp()
+        due_files = []
+        paths = set()
+        for path, ignored, signature in scanned_files[0]:
+            if ignored:
+                continue
+            paths.add(path)
+            if path not in self._rescan_due:
+                # file was just parsed, check it once its interval passes
+                interval = (
+                    RESCAN_MIN_INTERVAL
+                    if any(fnmatch.fnmatch(path, hot) for hot in RESCAN_HOT_FILES)
+                    else RESCAN_COLD_INTERVAL
+                )
+                self._rescan_intervals[path] = interval
+                self._rescan_due[path] = timestamp + interval
+            elif self._rescan_due[path] <= timestamp:
+                due_files.append((path, signature))
+        # forget files which are no longer scanned
+        for path in self._rescan_due.keys() - paths:
+            del self._rescan_due[path]
+            del self._rescan_intervals[path]
+        if not due_files:
+            return
+
+        modified_files = await self.hass.async_add_executor_job(
+            get_modified_files, due_files
+        )
+        for path, _ in due_files:
+            if path in modified_files:
+                interval = max(RESCAN_MIN_INTERVAL, self._rescan_intervals[path] / 2)
+            else:
+                interval = min(RESCAN_MAX_INTERVAL, self._rescan_intervals[path] * 2)
+            self._rescan_intervals[path] = interval
+            self._rescan_due[path] = timestamp + interval
+        _LOGGER.debug(
+            f"::coordinator:: Rescan checked {len(due_files)} files, modified: {sorted(modified_files)}"
+        )
+        if modified_files and self._on_files_changed:
+            await self._on_files_changed(modified_files)
 
     async def _async_setup(self) -> None:
         """Do initialization logic."""
@@ -69,76 +149,55 @@ class WatchmanCoordinator(DataUpdateCoordinator):
     async def _async_update_data(self) -> dict[str, Any]:
         """Update Watchman sensors.
 
-        Update will trigger parsing of configuration files if entry.runtime_data.force_parsing is set
+        Configuration files are parsed by ParseScheduler, which refreshes
+        the coordinator once parsing is done.
         """
 
-        if not parser_lock.locked():
-            async with parser_lock:
-                entry = get_entry(self.hass)
-                _LOGGER.debug(
-                    f"::coordinator._async_update_data:: force_parsing {entry.runtime_data.force_parsing}, parse_reason: {entry.runtime_data.parse_reason}"
+        _LOGGER.debug("::coordinator._async_update_data::")
+        if self.hass.is_running:
+            result = validate(self.hass)
+            entities_missing = result.entities_missing
+            services_missing = result.services_missing
+            self.hass.data[DOMAIN][HASS_DATA_VALIDATION] = result
+            self.hass.data[DOMAIN][HASS_DATA_CHECK_DURATION] = result.duration
+            self.hass.data[DOMAIN][HASS_DATA_MISSING_ENTITIES] = entities_missing
+            self.hass.data[DOMAIN][HASS_DATA_MISSING_SERVICES] = services_missing
+
+            # build entity attributes map for missing_entities sensor
+            entity_attrs = []
+            parsed_entity_list = self.hass.data[DOMAIN][HASS_DATA_PARSED_ENTITY_LIST]
+            for entity in entities_missing:
+                state, name = result.entity_states[entity]
+                entity_attrs.append(
+                    {
+                        "id": entity,
+                        "state": state,
+                        "friendly_name": name or "",
+                        "occurrences": fill(parsed_entity_list[entity], 0),
+                    }
                 )
 
-                if self.hass.is_running:
-                    if entry.runtime_data.force_parsing:
-                        await parse_config(
-                            self.hass, reason=entry.runtime_data.parse_reason
-                        )
-                        entry.runtime_data.force_parsing = False
-                    start_time = time.time()
-                    services_missing = renew_missing_actions_list(self.hass)
-                    entities_missing = renew_missing_entities_list(self.hass)
-                    self.hass.data[DOMAIN][HASS_DATA_CHECK_DURATION] = (
-                        time.time() - start_time
-                    )
-                    self.hass.data[DOMAIN][HASS_DATA_MISSING_ENTITIES] = (
-                        entities_missing
-                    )
-                    self.hass.data[DOMAIN][HASS_DATA_MISSING_SERVICES] = (
-                        services_missing
-                    )
-
-                    # build entity attributes map for missing_entities sensor
-                    entity_attrs = []
-                    parsed_entity_list = self.hass.data[DOMAIN][
-                        HASS_DATA_PARSED_ENTITY_LIST
-                    ]
-                    for entity in entities_missing:
-                        state, name = get_entity_state(
-                            self.hass, entity, friendly_names=True
-                        )
-                        entity_attrs.append(
-                            {
-                                "id": entity,
-                                "state": state,
-                                "friendly_name": name or "",
-                                "occurrences": fill(parsed_entity_list[entity], 0),
-                            }
-                        )
-
-                    # build service attributes map for missing_services sensor
-                    service_attrs = []
-                    parsed_service_list = self.hass.data[DOMAIN][
-                        HASS_DATA_PARSED_SERVICE_LIST
-                    ]
-                    for service in services_missing:
-                        service_attrs.append(
-                            {
-                                "id": service,
-                                "occurrences": fill(parsed_service_list[service], 0),
-                            }
-                        )
-
-                    self.data = {
-                        COORD_DATA_MISSING_ENTITIES: len(entities_missing),
-                        COORD_DATA_MISSING_SERVICES: len(services_missing),
-                        COORD_DATA_LAST_UPDATE: dt_util.now(),
-                        COORD_DATA_SERVICE_ATTRS: service_attrs,
-                        COORD_DATA_ENTITY_ATTRS: entity_attrs,
+            # build service attributes map for missing_services sensor
+            service_attrs = []
+            parsed_service_list = self.hass.data[DOMAIN][HASS_DATA_PARSED_SERVICE_LIST]
+            for service in services_missing:
+                service_attrs.append(
+                    {
+                        "id": service,
+                        "occurrences": fill(parsed_service_list[service], 0),
                     }
-                    _LOGGER.debug(
-                        f"::coordinator:: Watchman sensors updated, actions: {self.data[COORD_DATA_MISSING_SERVICES]}, entities: {self.data[COORD_DATA_MISSING_ENTITIES]}"
-                    )
+                )
 
-                    return self.data
+            self.data = {
+                COORD_DATA_MISSING_ENTITIES: len(entities_missing),
+                COORD_DATA_MISSING_SERVICES: len(services_missing),
+                COORD_DATA_LAST_UPDATE: dt_util.now(),
+                COORD_DATA_SERVICE_ATTRS: service_attrs,
+                COORD_DATA_ENTITY_ATTRS: entity_attrs,
+            }
+            _LOGGER.debug(
+                f"::coordinator:: Watchman sensors updated, actions: {self.data[COORD_DATA_MISSING_SERVICES]}, entities: {self.data[COORD_DATA_MISSING_ENTITIES]}"
+            )
+
+            return self.data
         return {}
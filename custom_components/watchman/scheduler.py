@@ -0,0 +1,162 @@
+"""Scheduler of configuration parsing for Watchman."""
+
+import asyncio
+from dataclasses import dataclass, field
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.event import async_call_later
+import yaml
+
+from .const import PARSE_QUIET_WINDOW
+from .coordinator import WatchmanCoordinator
+from .utils.logger import _LOGGER
+from .utils.parser import parse_config
+
+
+@dataclass
+class ParseRequest:
+    """Parse requests merged into one."""
+
+    reasons: list[str] = field(default_factory=list)
+    # configuration files should be parsed, not only loaded automations
+    parse_files: bool = False
+    # files changed on disk since the previous parse, None to walk all folders
+    changed_files: set[str] | None = field(default_factory=set)
+    # futures of the callers waiting for the parse to complete
+    waiters: list[asyncio.Future] = field(default_factory=list)
+
+    def merge(self, other: "ParseRequest") -> None:
+        """Merge other request into this one, so both are satisfied."""
+        self.reasons.extend(
+            reason for reason in other.reasons if reason not in self.reasons
+        )
+        if other.parse_files:
+            if not self.parse_files:
+                self.changed_files = (
+                    None if other.changed_files is None else set(other.changed_files)
+                )
+            elif self.changed_files is not None:
+                if other.changed_files is None:
+                    self.changed_files = None
+                else:
+                    self.changed_files |= other.changed_files
+            self.parse_files = True
+        self.waiters.extend(other.waiters)
+
+    def release(self) -> None:
+        """Resolve futures of the callers which still wait for the request."""
+        for waiter in self.waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+
+class ParseScheduler:
+    """Coalesce parse requests, so a burst of them triggers a single parse.
+
+    Requests are merged until none arrives for the quiet window, then the
+    configuration is parsed once for all of them and sensors are refreshed.
+    A request which arrives while a parse is running cancels it, the parse
+    starts over with the merged request once the window passes again.
+    """
+
+    def __init__(self, hass: HomeAssistant, coordinator: WatchmanCoordinator) -> None:
+        """Initialize scheduler."""
+        self.hass = hass
+        self.coordinator = coordinator
+        self._pending: ParseRequest | None = None
+        self._task: asyncio.Task | None = None
+        self._cancel_timer = None
+
+    @callback
+    def async_request(
+        self,
+        reason: str,
+        parse_files: bool = True,
+        changed_files: set[str] | None = None,
+        delay: float = PARSE_QUIET_WINDOW,
+    ) -> asyncio.Future:
+        """Request parsing, return future which is done once it is satisfied.
+
+        Only loaded automations are parsed if parse_files is False, otherwise
+        changed_files are parsed or all folders are walked if it is None.
+        """
+        future = self.hass.loop.create_future()
+        request = ParseRequest(
+            [reason],
+            parse_files,
+            None if changed_files is None else set(changed_files),
+            [future],
+        )
+        if self._pending is None:
+            self._pending = ParseRequest()
+        self._pending.merge(request)
+        if self._task and not self._task.done():
+            _LOGGER.debug(f"::scheduler:: New request ({reason}), cancel running parse")
+            self._task.cancel()
+        if self._cancel_timer:
+            self._cancel_timer()
+        self._cancel_timer = async_call_later(self.hass, delay, self._async_start)
+        return future
+
+    @callback
+    def stop(self) -> None:
+        """Cancel pending and running parse."""
+        if self._cancel_timer:
+            self._cancel_timer()
+            self._cancel_timer = None
+        if self._task and not self._task.done():
+            self._task.cancel()
+        if self._pending:
+            for waiter in self._pending.waiters:
+                waiter.cancel()
+            self._pending = None
+
+    async def _async_start(self, now) -> None:  # pylint: disable=unused-argument
+        """Start parsing once the quiet window passed."""
+        self._cancel_timer = None
+        if self._task and not self._task.done():
+            # let cancelled parse return its request to the pending one
+            await asyncio.wait([self._task])
+        if self._pending is None or self._cancel_timer:
+            # stopped or a new request came in meanwhile
+            return
+        request, self._pending = self._pending, None
+        self._task = self.hass.async_create_background_task(
+            self._async_parse(request), "watchman_parse"
+        )
+
+    async def _async_parse(self, request: ParseRequest) -> None:
+        """Parse configuration for merged request and refresh sensors."""
+        reason = ", ".join(request.reasons)
+        try:
+            if self.hass.is_running:
+                await parse_config(
+                    self.hass,
+                    reason=reason,
+                    parse_files=request.parse_files,
+                    changed_files=request.changed_files
+                    if request.parse_files
+                    else None,
+                )
+                await self.coordinator.async_refresh()
+            else:
+                # configuration is parsed once HA is started
+                _LOGGER.debug(f"::scheduler:: HA is not running, skip parse ({reason})")
+        except asyncio.CancelledError:
+            if self._pending is not None:
+                # parse was cancelled by a new request, keep older reasons first
+                request.merge(self._pending)
+                self._pending = request
+            else:
+                for waiter in request.waiters:
+                    waiter.cancel()
+            raise
+        except (HomeAssistantError, OSError, yaml.YAMLError):
+            _LOGGER.exception("Unable to parse configuration (%s)", reason)
+        except Exception:
+            # callers must not hang on a bug, the error itself is logged
+            # by the background task
+            request.release()
+            raise
+        request.release()
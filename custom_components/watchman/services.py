@@ -3,22 +3,35 @@ from custom_components.watchman.const import (
     CONF_ALLOWED_SERVICE_PARAMS,
     CONF_CHUNK_SIZE,
     CONF_CREATE_FILE,
+    CONF_IGNORED_FILES,
+    CONF_IGNORED_ITEMS,
     CONF_PARSE_CONFIG,
     CONF_REPORT_PATH,
     CONF_SEND_NOTIFICATION,
     CONF_SERVICE_DATA,
     CONF_SERVICE_NAME,
     DOMAIN,
+    HASS_DATA_FILES_ENTITY_LIST,
+    PREVIEW_IGNORES_SERVICE_NAME,
     REPORT_SERVICE_NAME,
 )
-from custom_components.watchman.utils.parser import parse_config
+from .utils.ignore import preview_ignores
 from .utils.report import async_report_to_file, async_report_to_notification
 from .utils.utils import get_config
 
 from custom_components.watchman.coordinator import WatchmanCoordinator
 from homeassistant.exceptions import ServiceValidationError
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, ServiceResponse, SupportsResponse
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.helpers import config_validation as cv
+import voluptuous as vol
+
+PREVIEW_IGNORES_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_IGNORED_ITEMS, default=""): cv.string,
+        vol.Optional(CONF_IGNORED_FILES, default=""): cv.string,
+    }
+)
 
 
 class WatchmanServicesSetup:
@@ -38,6 +51,25 @@ class WatchmanServicesSetup:
         self.hass.services.async_register(
             DOMAIN, REPORT_SERVICE_NAME, self.async_handle_report
         )
+        self.hass.services.async_register(
+            DOMAIN,
+            PREVIEW_IGNORES_SERVICE_NAME,
+            self.async_handle_preview_ignores,
+            schema=PREVIEW_IGNORES_SCHEMA,
+            supports_response=SupportsResponse.ONLY,
+        )
+
+    async def async_handle_preview_ignores(self, call) -> ServiceResponse:
+        """Return what candidate ignore rules would exclude, options are not changed."""
+        if HASS_DATA_FILES_ENTITY_LIST not in self.hass.data[DOMAIN]:
+            raise ServiceValidationError(
+                "Configuration is not parsed yet, try again once watchman sensors are updated."
+            )
+        return preview_ignores(
+            self.hass,
+            [x.strip() for x in call.data[CONF_IGNORED_ITEMS].split(",") if x.strip()],
+            [x.strip() for x in call.data[CONF_IGNORED_FILES].split(",") if x.strip()],
+        )
 
     async def async_handle_report(self, call):
         """Handle the action call."""
@@ -68,8 +100,9 @@ class WatchmanServicesSetup:
             )
 
         if call.data.get(CONF_PARSE_CONFIG, False):
-            await parse_config(self.hass, reason="service call")
-            await self.config_entry.runtime_data.coordinator.async_refresh()
+            await self.config_entry.runtime_data.scheduler.async_request(
+                "service call", delay=0
+            )
 
         # call notification action even when send notification = False
         if send_notification or action_name:
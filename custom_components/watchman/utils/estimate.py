@@ -0,0 +1,86 @@
+"""Estimate of the configuration parsing cost."""
+
+from dataclasses import dataclass
+import time
+
+import yaml
+
+from .extractors import LOVELACE_EXTRACTOR, YAML_EXTRACTOR, get_extractor
+from .logger import _LOGGER, INDENT
+from .lovelace import parse_lovelace
+from .scanner import create_scanner
+from .utils import scan_files
+from .yaml_ast import parse_yaml_ast
+from ..const import ESTIMATE_SAMPLE_FILES
+
+
+@dataclass(frozen=True)
+class ScanEstimate:
+    """Expected cost of parsing included folders."""
+
+    files: int
+    # total size of the files, bytes
+    size: int
+    # files skipped because of the size limit
+    skipped: int
+    # time to walk folders and parse all files, seconds
+    duration: float
+
+
+def estimate_scan(folder_tuples, ignored_files, yaml_ast, max_file_size):
+    """Walk folders and parse a sample of files to project the parsing time.
+
+    Blocking function, should be run in the executor. Up to
+    ESTIMATE_SAMPLE_FILES files spread evenly over the walk order are parsed,
+    their parsing rate (seconds per byte) is applied to the total size.
+    Files larger than max_file_size (bytes) are not parsed, so not counted.
+    Samples are scanned with a scanner of their own, so that they do not
+    take the line memo of the parser.
+    """
+    start_time = time.monotonic()
+    files, _ = scan_files(folder_tuples, ignored_files)
+    walk_time = time.monotonic() - start_time
+
+    sizes = []
+    skipped = 0
+    for path, ignored, signature in files:
+        if ignored:
+            continue
+        if max_file_size and signature[2] > max_file_size:
+            skipped += 1
+        else:
+            sizes.append((path, signature[2]))
+
+    total_size = sum(size for _, size in sizes)
+    step = max(1, len(sizes) // ESTIMATE_SAMPLE_FILES)
+    sample_size = 0
+    sample_time = 0.0
+    scanner = create_scanner()
+    for path, size in sizes[::step][:ESTIMATE_SAMPLE_FILES]:
+        start_time = time.monotonic()
+        try:
+            parse_sample(path, yaml_ast, scanner)
+        except (OSError, UnicodeDecodeError) as exception:
+            _LOGGER.debug(f"{INDENT}Unable to parse sample file {path}: {exception}")
+            continue
+        sample_time += time.monotonic() - start_time
+        sample_size += size
+
+    parse_time = sample_time * total_size / sample_size if sample_size else 0.0
+    return ScanEstimate(len(sizes), total_size, skipped, walk_time + parse_time)
+
+
+def parse_sample(path, yaml_ast, scanner):
+    """Extract references from a file the way its extractor does, with scanner."""
+    with open(path, "rb") as f:
+        text = str(f.read(), "utf-8")
+    extractor = get_extractor(path)
+    if extractor is LOVELACE_EXTRACTOR:
+        parse_lovelace(text, scanner=scanner)
+    elif extractor is YAML_EXTRACTOR and yaml_ast:
+        try:
+            parse_yaml_ast(text, scanner=scanner)
+        except yaml.YAMLError:
+            scanner.scan(text)
+    else:
+        scanner.scan(text)
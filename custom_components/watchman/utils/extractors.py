@@ -0,0 +1,90 @@
+"""Registry of reference extractors by file type."""
+
+from collections.abc import Callable
+from dataclasses import dataclass
+import fnmatch
+import re
+
+import yaml
+
+from .includes import find_includes
+from .logger import _LOGGER, INDENT
+from .lovelace import parse_lovelace
+from .scanner import SCANNER
+from .yaml_ast import parse_yaml_ast
+
+
+@dataclass(frozen=True)
+class Extractor:
+    """Extractor of entity and action references from a file type.
+
+    extract(path, text, yaml_ast, deadline) returns a tuple (entities,
+    services, includes), entities and services map references to their
+    locations, includes are [tag, path] pairs of included files. It should
+    raise TimeoutError once time.monotonic() passes deadline (if not None).
+    """
+
+    name: str
+    extract: Callable[[str, str, bool, float | None], tuple[dict, dict, list]]
+
+
+# (compiled glob patterns, extractor), the last registered are checked first
+EXTRACTORS: list[tuple[re.Pattern, Extractor]] = []
+
+
+def register_extractor(extractor, patterns):
+    """Register extractor for files which path matches one of glob patterns.
+
+    Extractors registered later take precedence, so specific patterns should
+    be registered after generic ones like `*.yaml`.
+    """
+    path_re = re.compile(
+        "|".join(f"(?:{fnmatch.translate(pattern)})" for pattern in patterns)
+    )
+    EXTRACTORS.insert(0, (path_re, extractor))
+
+
+def get_extractor(path):
+    """Return extractor for the file, files of unknown type are scanned as text."""
+    for path_re, extractor in EXTRACTORS:
+        if path_re.match(path):
+            return extractor
+    return TEXT_EXTRACTOR
+
+
+def extract_text(path, text, yaml_ast, deadline):  # pylint: disable=unused-argument
+    """Scan text for references."""
+    entities, services = SCANNER.scan(text, deadline)
+    return entities, services, []
+
+
+def extract_yaml(path, text, yaml_ast, deadline):
+    """Extract references and includes from a YAML file."""
+    if yaml_ast:
+        try:
+            entities, services = parse_yaml_ast(text, deadline)
+        except yaml.YAMLError as exception:
+            _LOGGER.debug(
+                f"{INDENT}Unable to load {path} as YAML, scan it as text: {exception}"
+            )
+            entities, services = SCANNER.scan(text, deadline)
+    else:
+        entities, services = SCANNER.scan(text, deadline)
+    return entities, services, find_includes(text)
+
+
+def extract_lovelace(path, text, yaml_ast, deadline):  # pylint: disable=unused-argument
+    """Extract references from a dashboard stored in .storage."""
+    entities, services = parse_lovelace(text, deadline)
+    return entities, services, []
+
+
+TEXT_EXTRACTOR = Extractor("text", extract_text)
+YAML_EXTRACTOR = Extractor("yaml", extract_yaml)
+# custom templates are plain Jinja, they neither include files nor are YAML
+JINJA_EXTRACTOR = Extractor("jinja", extract_text)
+LOVELACE_EXTRACTOR = Extractor("lovelace", extract_lovelace)
+
+register_extractor(YAML_EXTRACTOR, ["*.yaml", "*.yml"])
+register_extractor(JINJA_EXTRACTOR, ["*/custom_templates/*.jinja"])
+register_extractor(LOVELACE_EXTRACTOR, ["*/.storage/lovelace*"])
@@ -0,0 +1,140 @@
+"""Change detection of configuration files kept in a git repository."""
+
+from dataclasses import dataclass
+import os
+import subprocess
+
+from .logger import _LOGGER, INDENT
+from .utils import scan_files, split_glob_pattern
+from ..const import GIT_TIMEOUT
+
+
+@dataclass(frozen=True)
+class GitState:
+    """Worktree state of a git repository at the time of a scan."""
+
+    toplevel: str
+    # None for a repository without commits
+    head: str | None
+    # files which differ from HEAD: modified, deleted, untracked or ignored
+    dirty: frozenset[str]
+    # untracked or ignored folders which git does not list file by file,
+    # e.g. `.storage/` or nested repositories
+    folders: frozenset[str]
+
+
+def run_git(folder, *args):
+    """Run git command in folder and return its output, raise OSError on failure."""
+    try:
+        result = subprocess.run(
+            ["git", "--no-optional-locks", "-C", folder, *args],
+            capture_output=True,
+            check=True,
+            timeout=GIT_TIMEOUT,
+        )
+    except subprocess.CalledProcessError as exception:
+        raise OSError(exception.stderr.decode(errors="replace").strip()) from exception
+    except subprocess.TimeoutExpired as exception:
+        raise OSError(f"git {args[0]} timed out") from exception
+    return os.fsdecode(result.stdout)
+
+
+def get_git_state(folder):
+    """Return GitState of the repository folder belongs to or None.
+
+    Blocking function, should be run in the executor. Only the local
+    repository is read: HEAD and `git status` of the worktree, including
+    untracked and ignored files.
+    """
+    try:
+        toplevel = os.path.normpath(
+            run_git(folder, "rev-parse", "--show-toplevel").strip()
+        )
+        try:
+            head = run_git(toplevel, "rev-parse", "--verify", "-q", "HEAD").strip()
+        except OSError:
+            head = None
+        status = run_git(
+            toplevel, "status", "--porcelain", "-z", "-uall", "--ignored=matching"
+        )
+    except OSError as exception:
+        _LOGGER.debug(f"{INDENT}Unable to read git status of {folder}: {exception}")
+        return None
+
+    dirty = set()
+    folders = set()
+    entries = iter(status.split("\0"))
+    for entry in entries:
+        if not entry:
+            continue
+        code, path = entry[:2], os.path.join(toplevel, entry[3:])
+        if "R" in code or "C" in code:
+            # source path of a rename or copy follows
+            dirty.add(os.path.normpath(os.path.join(toplevel, next(entries, ""))))
+        if path.endswith("/"):
+            folders.add(os.path.normpath(path))
+        else:
+            dirty.add(os.path.normpath(path))
+    return GitState(toplevel, head, frozenset(dirty), frozenset(folders))
+
+
+def get_changed_files(previous, current, folder_tuples, ignored_files, scanned_files):
+    """Return files changed between two git states or None if it is not known.
+
+    Blocking function, should be run in the executor. Changed files are the
+    files which were dirty at either scan, files changed by commits between
+    HEADs and all files found in folders git does not list file by file.
+    Return None if some included folder is outside of the repository or
+    HEADs can not be compared, so folders should be walked.
+    """
+    if previous is None or current is None or previous.toplevel != current.toplevel:
+        return None
+    toplevel = current.toplevel
+    roots = [split_glob_pattern(*folder_tuple) for folder_tuple in folder_tuples]
+    if any(
+        root != toplevel and not root.startswith(toplevel + os.sep)
+        for root, _, _ in roots
+    ):
+        return None
+
+    changed_files = set(previous.dirty | current.dirty)
+    if previous.head != current.head:
+        if not previous.head or not current.head:
+            return None
+        try:
+            diff = run_git(
+                toplevel, "diff", "--name-only", "-z", previous.head, current.head
+            )
+        except OSError as exception:
+            _LOGGER.debug(f"{INDENT}Unable to read git diff: {exception}")
+            return None
+        changed_files.update(
+            os.path.normpath(os.path.join(toplevel, path))
+            for path in diff.split("\0")
+            if path
+        )
+
+    folders = previous.folders | current.folders
+    if folders:
+        # previously found files which are in opaque folders and files
+        # which are there now
+        changed_files.update(
+            path
+            for path, _, _ in scanned_files[0]
+            if any(path.startswith(folder + os.sep) for folder in folders)
+        )
+        for folder in current.folders:
+            for root, recursive, name_pattern in roots:
+                if folder.startswith(root + os.sep) and recursive:
+                    folder_tuple = (folder, f"**/{name_pattern}")
+                elif folder == root or root.startswith(folder + os.sep):
+                    folder_tuple = (
+                        root,
+                        f"**/{name_pattern}" if recursive else name_pattern,
+                    )
+                else:
+                    continue
+                files, _ = scan_files([folder_tuple], ignored_files)
+                changed_files.update(path for path, _, _ in files)
+    _LOGGER.debug(f"{INDENT}Git reports {len(changed_files)} changed files")
+    return changed_files
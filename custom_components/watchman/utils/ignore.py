@@ -0,0 +1,152 @@
+"""Matcher of ignored entities and actions rules."""
+
+import fnmatch
+import re
+
+from homeassistant.core import HomeAssistant
+
+from .scanner import TERMINAL, build_trie
+from .utils import get_config, get_ignored_files_matchers
+from ..const import (
+    BUNDLED_IGNORED_ITEMS,
+    CONF_IGNORED_ITEMS,
+    DOMAIN,
+    HASS_DATA_FILES_ENTITY_LIST,
+    HASS_DATA_FILES_SERVICE_LIST,
+    HASS_DATA_IGNORE_MATCHER,
+    HASS_DATA_LOADED_ENTITY_LIST,
+    HASS_DATA_LOADED_SERVICE_LIST,
+    HASS_DATA_SCANNED_FILES,
+    PREVIEW_SAMPLE_SIZE,
+)
+
+WILDCARD_CHARS = frozenset("*?[")
+
+
+class IgnoreMatcher:
+    """Match entity and action ids against glob rules in one pass.
+
+    Rules are split by their shape: rules without wildcards go to a set,
+    rules like `sensor.*` or `sensor.test_*` with a single trailing `*` go to
+    a prefix trie, the rest are compiled into a single regex. An id is
+    matched the same way fnmatch.fnmatchcase matches it against every rule,
+    but in time independent of the number of exact and prefix rules.
+    """
+
+    def __init__(self, rules):
+        """Compile the rules, empty rules are skipped."""
+        self.rules = tuple(rules)
+        self._exact = set()
+        prefixes = []
+        patterns = []
+        for rule in self.rules:
+            if not rule:
+                continue
+            if WILDCARD_CHARS.isdisjoint(rule):
+                self._exact.add(rule)
+            elif rule.endswith("*") and WILDCARD_CHARS.isdisjoint(rule[:-1]):
+                prefixes.append(rule[:-1])
+            else:
+                patterns.append(rule)
+        self._prefixes = build_trie(prefixes) if prefixes else None
+        self._pattern = (
+            re.compile("|".join(f"(?:{fnmatch.translate(p)})" for p in patterns))
+            if patterns
+            else None
+        )
+
+    def match(self, item: str) -> bool:
+        """Return True if item matches some rule."""
+        if item in self._exact:
+            return True
+        if (node := self._prefixes) is not None:
+            if TERMINAL in node:
+                return True
+            for char in item:
+                if (node := node.get(char)) is None:
+                    break
+                if TERMINAL in node:
+                    return True
+        return self._pattern is not None and self._pattern.match(item) is not None
+
+    def filter(self, items) -> list[str]:
+        """Return items which match some rule."""
+        return [item for item in items if self.match(item)]
+
+
+def get_ignore_matcher(hass: HomeAssistant) -> IgnoreMatcher:
+    """Return matcher of ignored items and bundled rules.
+
+    The matcher is compiled once and kept in hass.data until the
+    ignored items option changes.
+    """
+    rules = tuple(
+        sorted(set(get_config(hass, CONF_IGNORED_ITEMS, []) + BUNDLED_IGNORED_ITEMS))
+    )
+    matcher = hass.data[DOMAIN].get(HASS_DATA_IGNORE_MATCHER)
+    if matcher is None or matcher.rules != rules:
+        matcher = IgnoreMatcher(rules)
+        hass.data[DOMAIN][HASS_DATA_IGNORE_MATCHER] = matcher
+    return matcher
+
+
+def preview_ignores(hass: HomeAssistant, ignored_items, ignored_files):
+    """Return what candidate rules would exclude from the last parse results.
+
+    Every rule is matched alone against the references found by the last
+    parse (before ignored items are applied) and the files found by the
+    last scan, nothing is parsed or scanned again. Files inside folders
+    skipped by the current ignored files rules are not known, so they are
+    not counted.
+    """
+    data = hass.data[DOMAIN]
+    entities = list(
+        dict.fromkeys(
+            [*data[HASS_DATA_FILES_ENTITY_LIST], *data[HASS_DATA_LOADED_ENTITY_LIST]]
+        )
+    )
+    services = list(
+        dict.fromkeys(
+            [*data[HASS_DATA_FILES_SERVICE_LIST], *data[HASS_DATA_LOADED_SERVICE_LIST]]
+        )
+    )
+    scanned_files = data.get(HASS_DATA_SCANNED_FILES)
+    files = [path for path, _, _ in scanned_files[0]] if scanned_files else []
+
+    excluded_entities = set()
+    excluded_services = set()
+    excluded_files = set()
+    items_preview = []
+    for rule in ignored_items:
+        matcher = IgnoreMatcher([rule])
+        rule_entities = matcher.filter(entities)
+        rule_services = matcher.filter(services)
+        excluded_entities.update(rule_entities)
+        excluded_services.update(rule_services)
+        items_preview.append(
+            {
+                "rule": rule,
+                "entities": len(rule_entities),
+                "actions": len(rule_services),
+                "samples": [*rule_entities, *rule_services][:PREVIEW_SAMPLE_SIZE],
+            }
+        )
+    files_preview = []
+    for rule in ignored_files:
+        files_re, _ = get_ignored_files_matchers([rule])
+        rule_files = [path for path in files if files_re.match(path)]
+        excluded_files.update(rule_files)
+        files_preview.append(
+            {
+                "rule": rule,
+                "files": len(rule_files),
+                "samples": rule_files[:PREVIEW_SAMPLE_SIZE],
+            }
+        )
+    return {
+        "ignored_items": items_preview,
+        "ignored_files": files_preview,
+        "entities": len(excluded_entities),
+        "actions": len(excluded_services),
+        "files": len(excluded_files),
+    }
@@ -0,0 +1,55 @@
+"""Include graph of configuration files."""
+
+import os
+import re
+
+INCLUDE_PATTERN = re.compile(
+    r"(!include(?:_dir_(?:list|named|merge_list|merge_named))?)[^\S\n]+"
+    r"(?:\"([^\"\n]+)\"|'([^'\n]+)'|([^\s#,\]\}]+))"
+)
+INCLUDE_TAG = "!include"
+SECRET_YAML = "secrets.yaml"
+
+
+def find_includes(text):
+    """Return [tag, path] of `!include` and `!include_dir_*` tags found in text."""
+    if INCLUDE_TAG not in text:
+        return []
+    includes = []
+    for match in INCLUDE_PATTERN.finditer(text):
+        line_start = text.rfind("\n", 0, match.start()) + 1
+        if "#" in text[line_start : match.start()]:
+            # commented out
+            continue
+        includes.append(
+            [match.group(1), match.group(2) or match.group(3) or match.group(4)]
+        )
+    return includes
+
+
+def resolve_includes(yaml_file, includes, known_files):
+    """Return files of known_files which are included by yaml_file.
+
+    Paths are relative to the including file. A folder included with
+    `!include_dir_*` brings all `*.yaml` files found in it recursively, except
+    hidden files and folders and secrets.yaml, same as Home Assistant does.
+    """
+    folder = os.path.dirname(yaml_file)
+    included = []
+    for tag, path in includes:
+        target = os.path.normpath(os.path.join(folder, path))
+        if tag == INCLUDE_TAG:
+            if target in known_files:
+                included.append(target)
+            continue
+        prefix = target + os.sep
+        for known in known_files:
+            if not known.startswith(prefix) or not known.endswith(".yaml"):
+                continue
+            relative = known[len(prefix) :].split(os.sep)
+            if relative[-1] == SECRET_YAML or any(
+                part.startswith(".") for part in relative
+            ):
+                continue
+            included.append(known)
+    return included
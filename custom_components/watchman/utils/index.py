@@ -0,0 +1,165 @@
+"""Compact index of entity and action references."""
+
+from array import array
+from collections.abc import Iterator
+
+from ..const import INDEX_MAX_OCCURRENCES
+
+# locations which are not line numbers (JSON paths, automation ids) are stored
+# as ids in the string table with this flag set
+STRING_FLAG = 0x80000000
+# estimated memory footprint of index items, bytes
+ENTRY_SIZE = 160
+STRING_SIZE = 100
+OCCURRENCE_SIZE = 8
+COUNTER_SIZE = 100
+
+
+class OccurrenceIndex:
+    """Occurrences of references in configuration files.
+
+    File paths and non-numeric locations are interned to integer ids, the
+    occurrences of a reference are kept in a single array('I') of
+    (file id, location) pairs in the order they were added, so every file of
+    a reference and every line number in it are preserved.
+
+    Only the first max_occurrences of a reference are kept, further ones are
+    just counted per file. Once the estimated size of the index exceeds
+    memory_budget (bytes), only the first occurrence of every reference is
+    kept, so the index grows with the number of references only.
+    """
+
+    def __init__(
+        self,
+        max_occurrences: int = INDEX_MAX_OCCURRENCES,
+        memory_budget: int | None = None,
+    ) -> None:
+        """Initialize empty index."""
+        self.max_occurrences = max_occurrences
+        self.memory_budget = memory_budget
+        self.nbytes = 0
+        self._strings: list[str] = []
+        self._string_ids: dict[str, int] = {}
+        self._entries: dict[str, array] = {}
+        self._omitted: dict[str, dict[int, int]] = {}
+
+    def _intern(self, value: str) -> int:
+        """Return id of a string, add it to the string table if needed."""
+        if (string_id := self._string_ids.get(value)) is None:
+            string_id = len(self._strings)
+            self._strings.append(value)
+            self._string_ids[value] = string_id
+            self.nbytes += STRING_SIZE + len(value)
+        return string_id
+
+    def _decode(self, location: int) -> int | str:
+        """Return line number or string location."""
+        if location & STRING_FLAG:
+            return self._strings[location & ~STRING_FLAG]
+        return location
+
+    def _omit(self, entry: str, path: str, count: int) -> None:
+        """Count occurrences of entry in path which are not kept."""
+        counters = self._omitted.setdefault(entry, {})
+        path_id = self._intern(path)
+        if path_id not in counters:
+            self.nbytes += COUNTER_SIZE
+        counters[path_id] = counters.get(path_id, 0) + count
+
+    @property
+    def over_budget(self) -> bool:
+        """Return True if the index exceeds its memory budget."""
+        return bool(self.memory_budget) and self.nbytes > self.memory_budget
+
+    def add(self, entry: str, path: str, location: int | str) -> None:
+        """Add occurrence of entry at location (line number or text) in path."""
+        if (occurrences := self._entries.get(entry)) is None:
+            occurrences = self._entries[entry] = array("I")
+            self.nbytes += ENTRY_SIZE + len(entry)
+        elif len(occurrences) // 2 >= (1 if self.over_budget else self.max_occurrences):
+            self._omit(entry, path, 1)
+            return
+        if isinstance(location, str):
+            location = self._intern(location) | STRING_FLAG
+        occurrences.append(self._intern(path))
+        occurrences.append(location)
+        self.nbytes += OCCURRENCE_SIZE
+
+    def update(self, other: "OccurrenceIndex") -> None:
+        """Add all occurrences of another index."""
+        for entry in other:
+            for path, locations in other.kept(entry).items():
+                for location in locations:
+                    self.add(entry, path, location)
+            for path, count in other.omitted(entry).items():
+                self._omit(entry, path, count)
+
+    def copy(self) -> "OccurrenceIndex":
+        """Return a copy of the index."""
+        index = OccurrenceIndex(self.max_occurrences, self.memory_budget)
+        index.nbytes = self.nbytes
+        index._strings = self._strings.copy()
+        index._string_ids = self._string_ids.copy()
+        index._entries = {
+            entry: array("I", occurrences)
+            for entry, occurrences in self._entries.items()
+        }
+        index._omitted = {
+            entry: counters.copy() for entry, counters in self._omitted.items()
+        }
+        return index
+
+    def discard(self, entry: str) -> None:
+        """Remove entry from the index if it is present.
+
+        Interned strings may be shared with other entries, so they are kept.
+        """
+        if (occurrences := self._entries.pop(entry, None)) is not None:
+            self.nbytes -= (
+                ENTRY_SIZE + len(entry) + len(occurrences) // 2 * OCCURRENCE_SIZE
+            )
+        if (counters := self._omitted.pop(entry, None)) is not None:
+            self.nbytes -= len(counters) * COUNTER_SIZE
+
+    def __contains__(self, entry: object) -> bool:
+        """Return True if entry was found in configuration."""
+        return entry in self._entries
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over entries in the order they were found."""
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        """Return number of entries."""
+        return len(self._entries)
+
+    def __getitem__(self, entry: str) -> dict[str, list[int | str]]:
+        """Return locations of entry grouped by file.
+
+        Locations of a file with omitted occurrences end with `+N` item.
+        """
+        result = self.kept(entry)
+        for path, count in self.omitted(entry).items():
+            result.setdefault(path, []).append(f"+{count}")
+        return result
+
+    def kept(self, entry: str) -> dict[str, list[int | str]]:
+        """Return kept locations of entry grouped by file."""
+        occurrences = self._entries[entry]
+        result: dict[str, list[int | str]] = {}
+        for i in range(0, len(occurrences), 2):
+            path = self._strings[occurrences[i]]
+            result.setdefault(path, []).append(self._decode(occurrences[i + 1]))
+        return result
+
+    def omitted(self, entry: str) -> dict[str, int]:
+        """Return number of omitted occurrences of entry by file."""
+        return {
+            self._strings[path_id]: count
+            for path_id, count in self._omitted.get(entry, {}).items()
+        }
+
+    @property
+    def summarized(self) -> int:
+        """Return number of entries with omitted occurrences."""
+        return len(self._omitted)
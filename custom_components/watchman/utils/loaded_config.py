@@ -0,0 +1,100 @@
+"""Entity and action references of automations and scenes loaded to memory."""
+
+import os
+import re
+
+from homeassistant.core import HomeAssistant
+
+from .index import OccurrenceIndex
+from .scanner import SCANNER
+from .utils import is_parsed_path
+from ..const import LOADED_CONFIG_FILES, PARSER_STOP_WORDS
+
+SERVICE_KEYS = frozenset(["service", "action"])
+SERVICE_ID = re.compile(r"[A-Za-z_0-9]*\.[A-Za-z_0-9]+")
+STOP_KEYS = frozenset(PARSER_STOP_WORDS)
+
+
+def collect_loaded_config(hass: HomeAssistant, folder_tuples, ignored_files):
+    """Return references of UI managed automations and scenes.
+
+    References are taken from the loaded automation and scene components, the
+    location of a reference is its domain and the automation/scene id, e.g.
+    `automation:1718`. Return a tuple (entities, services, skipped_files,
+    external), skipped_files are the files which content is taken from memory
+    and should not be parsed, external is True if some automations are loaded
+    from other files, so files should be parsed after automations reload.
+    Automations and scenes of files which would not be parsed, because they
+    are ignored or outside of folder_tuples, are not taken from memory either.
+    """
+    entities = OccurrenceIndex()
+    services = OccurrenceIndex()
+    skipped_files = set()
+    external = False
+
+    if (component := hass.data.get("automation")) is not None:
+        config_file = hass.config.path(LOADED_CONFIG_FILES["automation"])
+        included = is_parsed_path(config_file, folder_tuples, ignored_files)
+        if included:
+            skipped_files.add(config_file)
+        for entity in component.entities:
+            raw_config = getattr(entity, "raw_config", None)
+            source = getattr(raw_config, "__config_file__", None)
+            if source and os.path.abspath(source) != config_file:
+                # automation is parsed from its file
+                external = True
+                continue
+            if not included:
+                continue
+            location = entity.unique_id or entity.entity_id
+            for entity_id in getattr(entity, "referenced_entities", ()):
+                add_reference(entities, entity_id, "automation", location)
+            if raw_config:
+                walk(raw_config, None, "automation", location, entities, services)
+
+    scene_file = hass.config.path(LOADED_CONFIG_FILES["scene"])
+    component = hass.data.get("scene")
+    if component is not None and is_parsed_path(
+        scene_file, folder_tuples, ignored_files
+    ):
+        scene_configs = [
+            scene_config
+            for entity in component.entities
+            if (scene_config := getattr(entity, "scene_config", None)) is not None
+        ]
+        # scenes do not keep their source file, hand-written scenes without id
+        # may be defined in scenes.yaml, so it is parsed as a file then
+        if all(scene_config.id for scene_config in scene_configs):
+            skipped_files.add(scene_file)
+            for scene_config in scene_configs:
+                for entity_id in scene_config.states:
+                    add_reference(entities, entity_id, "scene", scene_config.id)
+
+    return entities, services, skipped_files, external
+
+
+def add_reference(index, entry, domain, location):
+    """Add reference to the index with its synthetic location."""
+    if entry not in index or location not in index[entry].get(domain, []):
+        index.add(entry, domain, location)
+
+
+def walk(node, key, domain, location, entities, services):
+    """Collect actions and templated entities from the raw configuration."""
+    if isinstance(node, dict):
+        for child_key, child in node.items():
+            if child_key not in STOP_KEYS:
+                walk(child, child_key, domain, location, entities, services)
+    elif isinstance(node, list):
+        for child in node:
+            walk(child, key, domain, location, entities, services)
+    elif isinstance(node, str) and "." in node:
+        if key in SERVICE_KEYS:
+            if SERVICE_ID.fullmatch(node):
+                add_reference(services, node, domain, location)
+        elif "{" in node:
+            template_entities, template_services = SCANNER.scan(node)
+            for entity_id in template_entities:
+                add_reference(entities, entity_id, domain, location)
+            for service in template_services:
+                add_reference(services, service, domain, location)
@@ -0,0 +1,69 @@
+"""Extractor of entity and action references from Lovelace dashboards in .storage."""
+
+import json
+import os
+import re
+import time
+
+from .scanner import SCANNER
+
+# keys which values are entity ids or lists of them
+ENTITY_KEYS = frozenset(["entity", "entities", "entity_id", "camera_image"])
+# keys which values are actions, e.g. `service` of a `tap_action`
+SERVICE_KEYS = frozenset(["service", "action", "perform_action"])
+SERVICE_ID = re.compile(r"[A-Za-z_0-9]*\.[A-Za-z_0-9]+")
+STORAGE_FOLDER = f"{os.sep}.storage{os.sep}"
+
+
+def is_lovelace_storage(path):
+    """Return True if path is a dashboard stored by Home Assistant in .storage."""
+    return STORAGE_FOLDER in path and os.path.basename(path).startswith("lovelace")
+
+
+def parse_lovelace(text, deadline=None, scanner=SCANNER):
+    """Return entities and actions found in a dashboard with their JSON paths.
+
+    Only string values under known keys are treated as references, templates
+    (e.g. `content` of a markdown card) are scanned as text. Documents which
+    are not valid JSON are scanned as text and reported with line numbers.
+    Raise TimeoutError if the dashboard is not parsed by deadline, a
+    time.monotonic() value. Text is scanned with the given scanner.
+    """
+    try:
+        document = json.loads(text)
+    except ValueError:
+        return scanner.scan(text, deadline)
+    entities = {}
+    services = {}
+    config = document
+    if isinstance(document, dict) and isinstance(document.get("data"), dict):
+        config = document["data"].get("config", document["data"])
+    walk(config, "", None, entities, services, deadline, scanner)
+    return entities, services
+
+
+def walk(node, path, key, entities, services, deadline=None, scanner=SCANNER):
+    """Collect references from a JSON node found under key at path."""
+    if isinstance(node, dict):
+        if deadline and time.monotonic() > deadline:
+            raise TimeoutError
+        for child_key, child in node.items():
+            child_path = f"{path}.{child_key}" if path else str(child_key)
+            walk(child, child_path, child_key, entities, services, deadline, scanner)
+    elif isinstance(node, list):
+        for index, child in enumerate(node):
+            walk(child, f"{path}[{index}]", key, entities, services, deadline, scanner)
+    elif isinstance(node, str):
+        if key in ENTITY_KEYS:
+            for value in node.split(","):
+                if scanner.is_entity(value := value.strip()):
+                    entities.setdefault(value, []).append(path)
+        elif key in SERVICE_KEYS:
+            if SERVICE_ID.fullmatch(node):
+                services.setdefault(node, []).append(path)
+        elif "{" in node:
+            template_entities, template_services = scanner.scan(node)
+            for value in template_entities:
+                entities.setdefault(value, []).append(path)
+            for value in template_services:
+                services.setdefault(value, []).append(path)
@@ -0,0 +1,137 @@
+"""Persistent cache of per-file parse results."""
+
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .logger import _LOGGER, INDENT
+from .extractors import get_extractor
+from ..const import (
+    PARSE_CACHE_SAVE_DELAY,
+    PARSE_CACHE_STORAGE_KEY,
+    PARSE_CACHE_STORAGE_VERSION,
+)
+
+
+class _ParseCacheStore(Store):
+    """Store which discards cache data written by other parser versions."""
+
+    async def _async_migrate_func(self, old_major_version, old_minor_version, old_data):
+        """Drop outdated cache, it will be rebuilt by the next parse."""
+        return {}
+
+
+class ParseCache:
+    """Parse results of configuration files keyed by file identity and mtime.
+
+    A file is re-parsed only when its (device, inode, size, mtime_ns) signature
+    differs from the cached one and its content digest changed, e.g. dashboards
+    which are saved by Home Assistant without modifications are not parsed
+    again. Files which failed to parse (e.g. non UTF-8 content) are cached as
+    failed until they change.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize parse cache."""
+        self._store = _ParseCacheStore(
+            hass, PARSE_CACHE_STORAGE_VERSION, PARSE_CACHE_STORAGE_KEY
+        )
+        self._files: dict[str, dict[str, Any]] = {}
+        self._mode: str | None = None
+        self.hits = 0
+        self.misses = 0
+
+    async def async_load(self) -> None:
+        """Load cached parse results from .storage."""
+        data = await self._store.async_load()
+        self._files = (data or {}).get("files", {})
+        self._mode = (data or {}).get("mode")
+        _LOGGER.debug(f"{INDENT}Parse cache loaded: {len(self._files)} files")
+
+    def get(self, path: str, signature: list[int]) -> dict[str, Any] | None:
+        """Return cached parse result if the file did not change since last parse."""
+        if (entry := self._files.get(path)) and entry["signature"] == signature:
+            self.hits += 1
+            return entry
+        self.misses += 1
+        return None
+
+    def store(
+        self,
+        path: str,
+        signature: list[int] | None,
+        entities: dict[str, list[int | str]],
+        services: dict[str, list[int | str]],
+        error: str | None = None,
+        digest: str | None = None,
+        includes: list[list[str]] | None = None,
+        skipped: str | None = None,
+    ) -> dict[str, Any]:
+        """Store parse result of a file, skipped is the reason it was not parsed.
+
+        A result stored without signature is never returned by get, so the
+        file is parsed again.
+        """
+        entry = {
+            "signature": signature,
+            "entities": entities,
+            "services": services,
+            "error": error,
+            "digest": digest,
+            "includes": includes or [],
+            "skipped": skipped,
+        }
+        self._files[path] = entry
+        return entry
+
+    def get_digest(self, path: str) -> str | None:
+        """Return content digest of the file when it was parsed last time."""
+        if entry := self._files.get(path):
+            return entry.get("digest")
+        return None
+
+    def get_digest_index(self) -> dict[tuple[str, str], dict[str, Any]]:
+        """Return parse results by extractor name and content digest."""
+        return {
+            (get_extractor(path).name, entry["digest"]): entry
+            for path, entry in self._files.items()
+            if entry.get("digest") and not entry["error"]
+        }
+
+    def touch(self, path: str, signature: list[int]) -> dict[str, Any]:
+        """Update signature of a file which was rewritten with the same content."""
+        entry = self._files[path]
+        entry["signature"] = signature
+        return entry
+
+    def prune(self, paths: set[str]) -> None:
+        """Forget files which were removed or excluded from parsing."""
+        for path in [p for p in self._files if p not in paths]:
+            del self._files[path]
+
+    def set_mode(self, mode: str) -> None:
+        """Drop cached results if files were parsed in another parser mode."""
+        if mode != self._mode:
+            if self._files:
+                _LOGGER.debug(f"{INDENT}Parser mode changed to {mode}, reset cache")
+            self._files = {}
+            self._mode = mode
+
+    def reset_stats(self) -> None:
+        """Reset cache hit/miss counters before a new parse."""
+        self.hits = 0
+        self.misses = 0
+
+    def async_schedule_save(self) -> None:
+        """Save parse cache to .storage with a delay."""
+        self._store.async_delay_save(self._data_to_save, PARSE_CACHE_SAVE_DELAY)
+
+    async def async_remove(self) -> None:
+        """Remove parse cache from .storage."""
+        self._files = {}
+        await self._store.async_remove()
+
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return data of parse cache to store in a file."""
+        return {"mode": self._mode, "files": self._files}
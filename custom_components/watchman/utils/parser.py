@@ -1,34 +1,85 @@
 """Watchman parser funcions."""
 
-import fnmatch
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import math
+import mmap
 import os
-import re
 import time
-import anyio
+
 from homeassistant.core import HomeAssistant
-from homeassistant.const import Platform
 
+from .extractors import get_extractor
+from .git import get_changed_files, get_git_state
+from .includes import resolve_includes
+from .ignore import get_ignore_matcher
+from .index import OccurrenceIndex
+from .loaded_config import collect_loaded_config
 from .logger import INDENT, _LOGGER
-from .utils import async_get_next_file, get_config
+from .lovelace import is_lovelace_storage
+from .parse_cache import ParseCache
+from .scanner import SCANNER
+from .utils import (
+    get_config,
+    get_entry,
+    get_val,
+    rescan_files,
+    scan_files,
+    to_lists,
+)
 from ..const import (
-    BUNDLED_IGNORED_ITEMS,
+    CONFIG_YAML,
     CONF_CHECK_LOVELACE,
     CONF_IGNORED_FILES,
-    CONF_IGNORED_ITEMS,
     CONF_INCLUDED_FOLDERS,
-    DEFAULT_HA_DOMAINS,
+    CONF_PARSER_FILE_TIME_BUDGET,
+    CONF_PARSER_GIT_CHANGES,
+    CONF_PARSER_MAX_FILE_SIZE,
+    CONF_PARSER_MEMORY_BUDGET,
+    CONF_PARSER_INCLUDE_GRAPH,
+    CONF_PARSER_WORKERS,
+    CONF_PARSER_YAML_AST,
+    DEFAULT_PARSER_FILE_TIME_BUDGET,
+    DEFAULT_PARSER_MAX_FILE_SIZE,
+    DEFAULT_PARSER_MEMORY_BUDGET,
+    DEFAULT_PARSER_WORKERS,
     DOMAIN,
+    HASS_DATA_FILES_ENTITY_LIST,
     HASS_DATA_FILES_IGNORED,
     HASS_DATA_FILES_PARSED,
+    HASS_DATA_FILES_SERVICE_LIST,
+    HASS_DATA_LOADED_ENTITY_LIST,
+    HASS_DATA_LOADED_SERVICE_LIST,
+    HASS_DATA_FILES_SKIPPED,
+    HASS_DATA_SCANNED_FILES,
+    HASS_DATA_GIT_STATE,
+    HASS_DATA_FILES_REJECTED,
+    HASS_DATA_FOLDERS_IGNORED,
+    HASS_DATA_PARSE_CACHE,
     HASS_DATA_PARSE_DURATION,
     HASS_DATA_PARSED_ENTITY_LIST,
     HASS_DATA_PARSED_SERVICE_LIST,
-    PARSER_STOP_WORDS,
+    PARSER_BATCHES_PER_WORKER,
+    PARSER_BINARY_SNIFF_SIZE,
+    PARSER_MMAP_THRESHOLD,
+    PARSER_MODE_AST,
+    PARSER_MODE_TEXT,
 )
 
 
-async def parse_config(hass: HomeAssistant, reason=None):
-    """Parse home assistant configuration files."""
+async def parse_config(
+    hass: HomeAssistant, reason=None, parse_files=True, changed_files=None
+):
+    """Parse home assistant configuration files.
+
+    References of UI managed automations and scenes are taken from memory, with
+    parse_files=False configuration files are not parsed again unless some
+    reloaded automations are defined in them. If changed_files are given, only
+    these files are checked for changes instead of walking included folders,
+    with git_changes option they are taken from git status of the config
+    directory.
+    """
 
     start_time = time.time()
 
@@ -38,126 +89,527 @@ async def parse_config(hass: HomeAssistant, reason=None):
         f"::parse_config:: called due to {reason} IGNORED_FILES={ignored_files}"
     )
 
-    parsed_entity_list, parsed_service_list, files_parsed, files_ignored = await parse(
-        hass, included_folders, ignored_files, hass.config.config_dir
+    loaded_entity_list, loaded_service_list, skipped_files, external = (
+        collect_loaded_config(hass, included_folders, ignored_files)
     )
-    hass.data[DOMAIN][HASS_DATA_PARSED_ENTITY_LIST] = parsed_entity_list
-    hass.data[DOMAIN][HASS_DATA_PARSED_SERVICE_LIST] = parsed_service_list
-    hass.data[DOMAIN][HASS_DATA_FILES_PARSED] = files_parsed
-    hass.data[DOMAIN][HASS_DATA_FILES_IGNORED] = files_ignored
+
+    if parse_files or external or HASS_DATA_FILES_ENTITY_LIST not in hass.data[DOMAIN]:
+        if HASS_DATA_PARSE_CACHE not in hass.data[DOMAIN]:
+            parse_cache = ParseCache(hass)
+            await parse_cache.async_load()
+            hass.data[DOMAIN][HASS_DATA_PARSE_CACHE] = parse_cache
+
+        scanned_files = hass.data[DOMAIN].get(HASS_DATA_SCANNED_FILES)
+        git_state = None
+        if get_config(hass, CONF_PARSER_GIT_CHANGES):
+            git_state = await hass.async_add_executor_job(
+                get_git_state, hass.config.config_dir
+            )
+            if changed_files is None and scanned_files is not None:
+                changed_files = await hass.async_add_executor_job(
+                    get_changed_files,
+                    hass.data[DOMAIN].get(HASS_DATA_GIT_STATE),
+                    git_state,
+                    included_folders,
+                    ignored_files,
+                    scanned_files,
+                )
+
+        (
+            files_entity_list,
+            files_service_list,
+            files_parsed,
+            files_ignored,
+            folders_ignored,
+            files_skipped,
+            scanned_files,
+            files_rejected,
+        ) = await parse(
+            hass,
+            included_folders,
+            ignored_files,
+            hass.config.config_dir,
+            hass.data[DOMAIN][HASS_DATA_PARSE_CACHE],
+            get_config(hass, CONF_PARSER_WORKERS),
+            get_config(hass, CONF_PARSER_YAML_AST),
+            skipped_files,
+            get_config(hass, CONF_PARSER_INCLUDE_GRAPH),
+            get_config(hass, CONF_PARSER_MEMORY_BUDGET),
+            changed_files,
+            scanned_files,
+            get_config(hass, CONF_PARSER_MAX_FILE_SIZE),
+            get_config(hass, CONF_PARSER_FILE_TIME_BUDGET),
+        )
+        hass.data[DOMAIN][HASS_DATA_FILES_ENTITY_LIST] = files_entity_list
+        hass.data[DOMAIN][HASS_DATA_FILES_SERVICE_LIST] = files_service_list
+        hass.data[DOMAIN][HASS_DATA_FILES_PARSED] = files_parsed
+        hass.data[DOMAIN][HASS_DATA_FILES_IGNORED] = files_ignored
+        hass.data[DOMAIN][HASS_DATA_FOLDERS_IGNORED] = folders_ignored
+        hass.data[DOMAIN][HASS_DATA_FILES_SKIPPED] = files_skipped
+        hass.data[DOMAIN][HASS_DATA_SCANNED_FILES] = scanned_files
+        hass.data[DOMAIN][HASS_DATA_GIT_STATE] = git_state
+        hass.data[DOMAIN][HASS_DATA_FILES_REJECTED] = files_rejected
+    else:
+        _LOGGER.debug(f"{INDENT}Configuration files are not changed, skip parsing")
+
+    hass.data[DOMAIN][HASS_DATA_LOADED_ENTITY_LIST] = loaded_entity_list
+    hass.data[DOMAIN][HASS_DATA_LOADED_SERVICE_LIST] = loaded_service_list
+    apply_ignored_items(hass)
     hass.data[DOMAIN][HASS_DATA_PARSE_DURATION] = time.time() - start_time
     _LOGGER.debug(
         f"{INDENT}Parsing took {hass.data[DOMAIN][HASS_DATA_PARSE_DURATION]:.2f}s."
     )
 
 
+def apply_ignored_items(hass):
+    """Build parsed lists from references of the last parse without ignored items.
+
+    References found in files and loaded from memory are kept unfiltered, so
+    changed ignored items are applied without parsing files again.
+    """
+    parsed_entity_list, parsed_service_list = remove_ignored_items(
+        hass,
+        merge_references(
+            hass.data[DOMAIN][HASS_DATA_FILES_ENTITY_LIST],
+            hass.data[DOMAIN][HASS_DATA_LOADED_ENTITY_LIST],
+        ),
+        merge_references(
+            hass.data[DOMAIN][HASS_DATA_FILES_SERVICE_LIST],
+            hass.data[DOMAIN][HASS_DATA_LOADED_SERVICE_LIST],
+        ),
+    )
+    hass.data[DOMAIN][HASS_DATA_PARSED_ENTITY_LIST] = parsed_entity_list
+    hass.data[DOMAIN][HASS_DATA_PARSED_SERVICE_LIST] = parsed_service_list
+    _LOGGER.debug(
+        f"{INDENT}Found {len(parsed_entity_list)} entities and {len(parsed_service_list)} actions"
+    )
+
+
+def merge_references(files_index, loaded_index):
+    """Return references found in files merged with references loaded from memory."""
+    merged = files_index.copy()
+    merged.update(loaded_index)
+    return merged
+
+
+def remove_ignored_items(hass, parsed_entity_list, parsed_service_list):
+    """Remove ignored entities and services from resulting lists."""
+    matcher = get_ignore_matcher(hass)
+    excluded_entities = matcher.filter(parsed_entity_list)
+    excluded_services = matcher.filter(parsed_service_list)
+
+    for entity in excluded_entities:
+        parsed_entity_list.discard(entity)
+    for service in excluded_services:
+        parsed_service_list.discard(service)
+    return parsed_entity_list, parsed_service_list
+
+
 async def async_get_short_path(yaml_file, root):
     """Provide short path for unit test mocking."""
     return os.path.relpath(yaml_file, root)
 
 
-async def parse(hass, folders, ignored_files, root_path=None):
-    """Parse a yaml or json file for entities/services."""
+async def parse(
+    hass,
+    folders,
+    ignored_files,
+    root_path=None,
+    parse_cache=None,
+    workers=DEFAULT_PARSER_WORKERS,
+    yaml_ast=False,
+    skipped_files=None,
+    include_graph=False,
+    memory_budget=DEFAULT_PARSER_MEMORY_BUDGET,
+    changed_files=None,
+    scanned_files=None,
+    max_file_size=DEFAULT_PARSER_MAX_FILE_SIZE,
+    time_budget=DEFAULT_PARSER_FILE_TIME_BUDGET,
+):
+    """Parse a yaml or json file for entities/services.
+
+    Files which did not change since the previous parse are taken from parse_cache,
+    the rest are parsed in a pool of worker threads. With yaml_ast, YAML files
+    are parsed to the document tree instead of being scanned as text. Files in
+    skipped_files are neither parsed nor counted as ignored. With include_graph,
+    only files reachable from configuration.yaml in root_path via `!include`
+    tags are parsed, the rest are counted as skipped. memory_budget (MiB)
+    bounds the size of the returned indexes. If both changed_files and
+    scanned_files (folders walk result of the previous parse) are given,
+    only changed_files are checked instead of walking the folders again.
+    Files larger than max_file_size (KiB), binary files and files which take
+    longer than time_budget (seconds) to parse are skipped, 0 disables a limit.
+    """
     parsed_files_count = 0
-    entity_pattern = re.compile(
-        r"(?:(?<=\s)|(?<=^)|(?<=\")|(?<=\'))([A-Za-z_0-9]*\s*:)?(?:\s*)?(?:states.)?"
-        rf"(({"|".join([*Platform, *DEFAULT_HA_DOMAINS])})\.[A-Za-z_*0-9]+)"
-    )
-    service_pattern = re.compile(
-        r"(?:service|action):\s*([A-Za-z_0-9]*\.[A-Za-z_0-9]+)"
-    )
-    comment_pattern = re.compile(
-        rf"(^\s*(?:{"|".join([*PARSER_STOP_WORDS])}):.*)|(\s*#.*)"
-    )
-    parsed_entity_list = {}
-    parsed_service_list = {}
+    # budget is shared between entities and actions
+    budget = memory_budget * 1024 * 1024 // 2 if memory_budget else None
+    parsed_entity_list = OccurrenceIndex(memory_budget=budget)
+    parsed_service_list = OccurrenceIndex(memory_budget=budget)
     parsed_files = []
     effectively_ignored_files = []
-    async for yaml_file, ignored in async_get_next_file(folders, ignored_files):
+    skipped_graph_files = []
+    rejected_files = []
+    if parse_cache:
+        parse_cache.reset_stats()
+        # cached results depend on the parser mode and file limits
+        parse_cache.set_mode(
+            f"{PARSER_MODE_AST if yaml_ast else PARSER_MODE_TEXT}:{max_file_size}:{time_budget}"
+        )
+    if changed_files is not None and scanned_files is not None:
+        scanned_files = await hass.async_add_executor_job(
+            rescan_files, scanned_files, changed_files, folders, ignored_files
+        )
+    else:
+        scanned_files = await hass.async_add_executor_job(
+            scan_files, folders, ignored_files
+        )
+    files, ignored_folders = scanned_files
+    if skipped_files:
+        files = [f for f in files if f[0] not in skipped_files]
+
+    results = {}
+
+    async def async_take_results(yaml_files):
+        """Take unchanged files from the cache, parse the rest in the worker pool."""
+        changed_files = {}
+        for yaml_file in yaml_files:
+            signature = signatures[yaml_file]
+            if parse_cache and (result := parse_cache.get(yaml_file, signature)):
+                results[yaml_file] = result
+            else:
+                changed_files[yaml_file] = signature
+        # files which were rewritten with the same content are not parsed again
+        # and files with the same content as an already parsed one are not
+        # parsed at all, e.g. copies of a package
+        digests = {}
+        known_content = {}
+        if parse_cache and changed_files:
+            digests = {f: parse_cache.get_digest(f) for f in changed_files}
+            known_content = parse_cache.get_digest_index()
+        parsed_results = await async_parse_files(
+            list(changed_files),
+            workers,
+            digests,
+            yaml_ast,
+            known_content,
+            max_file_size * 1024,
+            time_budget,
+        )
+        for yaml_file, result in parsed_results.items():
+            signature = changed_files[yaml_file]
+            if result is None:
+                result = parse_cache.touch(yaml_file, signature)
+            elif parse_cache:
+                # results which depend on load are stored without a signature,
+                # so the file is parsed again next time
+                if result.pop("retry", False):
+                    signature = None
+                result = parse_cache.store(yaml_file, signature, **result)
+            results[yaml_file] = result
+
+    signatures = {path: sig for path, ignored, sig in files if not ignored}
+    if include_graph and root_path:
+        # parse files reachable from configuration.yaml level by level, only
+        # changed files are read, includes of the rest are taken from the cache
+        level = [
+            path
+            for path in signatures
+            if is_lovelace_storage(path) or path == os.path.join(root_path, CONFIG_YAML)
+        ]
+        reachable = set(level)
+        while level:
+            await async_take_results(level)
+            next_level = []
+            for yaml_file in level:
+                if (result := results.get(yaml_file)) is None:
+                    continue
+                for included in resolve_includes(
+                    yaml_file, result.get("includes", []), signatures
+                ):
+                    if included not in reachable:
+                        reachable.add(included)
+                        next_level.append(included)
+            level = next_level
+    else:
+        await async_take_results(list(signatures))
+
+    # merge per-file results in the scan order
+    for yaml_file, ignored, _ in files:
         short_path = await async_get_short_path(yaml_file, root_path)
         if ignored:
             effectively_ignored_files.append(short_path)
             continue
 
-        try:
-            lineno = 1
-            async with await anyio.open_file(
-                yaml_file, mode="r", encoding="utf-8"
-            ) as f:
-                async for line in f:
-                    line = re.sub(comment_pattern, "", line)
-                    for match in re.finditer(entity_pattern, line):
-                        typ, val = match.group(1), match.group(2)
-                        if (
-                            typ != "service:"
-                            and "*" not in val
-                            and not val.endswith(".yaml")
-                        ):
-                            add_entry(parsed_entity_list, val, short_path, lineno)
-                    for match in re.finditer(service_pattern, line):
-                        val = match.group(1)
-                        add_entry(parsed_service_list, val, short_path, lineno)
-                    lineno += 1
-            parsed_files_count += 1
-            parsed_files.append(short_path)
-        except OSError as exception:
-            _LOGGER.error("Unable to parse %s: %s", yaml_file, exception)
-        except UnicodeDecodeError as exception:
+        if yaml_file not in results:
+            if include_graph:
+                skipped_graph_files.append(short_path)
+            continue
+
+        result = results[yaml_file]
+        if result.get("skipped"):
+            _LOGGER.warning("Skipped %s: %s", yaml_file, result["skipped"])
+            rejected_files.append((short_path, result["skipped"]))
+            continue
+        if result["error"]:
             _LOGGER.error(
                 "Unable to parse %s: %s. Use UTF-8 encoding to avoid this error",
                 yaml_file,
-                exception,
+                result["error"],
             )
-    # remove ignored entities and services from resulting lists
-    ignored_items = get_config(hass, CONF_IGNORED_ITEMS, [])
-    ignored_items = list(set(ignored_items + BUNDLED_IGNORED_ITEMS))
-    excluded_entities = []
-    excluded_services = []
-    for itm in ignored_items:
-        if itm:
-            excluded_entities.extend(fnmatch.filter(parsed_entity_list, itm))
-            excluded_services.extend(fnmatch.filter(parsed_service_list, itm))
-
-    parsed_entity_list = {
-        k: v for k, v in parsed_entity_list.items() if k not in excluded_entities
-    }
-    parsed_service_list = {
-        k: v for k, v in parsed_service_list.items() if k not in excluded_services
-    }
+            continue
+
+        for entity, lines in result["entities"].items():
+            for lineno in lines:
+                parsed_entity_list.add(entity, short_path, lineno)
+        for service, lines in result["services"].items():
+            for lineno in lines:
+                parsed_service_list.add(service, short_path, lineno)
+        parsed_files_count += 1
+        parsed_files.append(short_path)
+
+    if parse_cache:
+        parse_cache.prune(set(results))
+        parse_cache.async_schedule_save()
+        _LOGGER.debug(
+            f"{INDENT}Parse cache: {parse_cache.hits} files unchanged, {parse_cache.misses} files parsed"
+        )
 
+    memo_info = SCANNER.memo_info()
+    _LOGGER.debug(
+        f"{INDENT}Line memo: {memo_info.hits} hits, {memo_info.misses} misses, {memo_info.currsize}/{memo_info.maxsize} lines"
+    )
     _LOGGER.debug(f"{INDENT}Parsed {parsed_files_count} files: {parsed_files}")
     _LOGGER.debug(
         f"{INDENT}Ignored {len(effectively_ignored_files)} files: {effectively_ignored_files}",
     )
     _LOGGER.debug(
-        f"{INDENT}Found {len(parsed_entity_list)} entities and {len(parsed_service_list)} actions"
+        f"{INDENT}Skipped {len(ignored_folders)} folders: {ignored_folders}",
     )
+    if include_graph:
+        _LOGGER.debug(
+            f"{INDENT}Skipped {len(skipped_graph_files)} files outside include graph: {skipped_graph_files}",
+        )
 
     return (
         parsed_entity_list,
         parsed_service_list,
         parsed_files_count,
         len(effectively_ignored_files),
+        len(ignored_folders),
+        len(skipped_graph_files),
+        scanned_files,
+        rejected_files,
     )
 
 
-def add_entry(_list, entry, yaml_file, lineno):
-    """Add entry to list of missing entities/services with line number information."""
-    if entry in _list:
-        if yaml_file in _list[entry]:
-            _list[entry].get(yaml_file, []).append(lineno)
-    else:
-        _list[entry] = {yaml_file: [lineno]}
+async def async_parse_files(
+    yaml_files,
+    workers,
+    digests=None,
+    yaml_ast=False,
+    known_content=None,
+    max_file_size=0,
+    time_budget=0,
+):
+    """Parse files in a bounded pool of worker threads.
+
+    Files are split into batches, each worker parses its batch sequentially and
+    keeps a single file open at a time, so at most `workers` files are open.
+    Return a dict with parse results of the files which could be read, the
+    result is None if file content digest equals to the one in digests. Results
+    of known_content are reused for files with the same content digest.
+    """
+    if not yaml_files:
+        return {}
+    digests = digests or {}
+    known_content = known_content or {}
+    workers = max(1, min(workers, len(yaml_files)))
+    batch_size = math.ceil(len(yaml_files) / (workers * PARSER_BATCHES_PER_WORKER))
+    batches = [
+        yaml_files[i : i + batch_size] for i in range(0, len(yaml_files), batch_size)
+    ]
+    _LOGGER.debug(
+        f"{INDENT}Parse {len(yaml_files)} files with {workers} workers in {len(batches)} batches"
+    )
+    loop = asyncio.get_running_loop()
+    pool = ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix=f"{DOMAIN}_parser"
+    )
+    try:
+        batch_results = await asyncio.gather(
+            *[
+                loop.run_in_executor(
+                    pool,
+                    parse_batch,
+                    b,
+                    digests,
+                    yaml_ast,
+                    known_content,
+                    max_file_size,
+                    time_budget,
+                )
+                for b in batches
+            ]
+        )
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    return {path: res for batch in batch_results for path, res in batch.items()}
+
+
+def parse_batch(
+    yaml_files,
+    digests,
+    yaml_ast=False,
+    known_content=None,
+    max_file_size=0,
+    time_budget=0,
+):
+    """Parse a batch of files, runs in a worker thread.
+
+    A file which content digest equals to the one in digests did not change
+    since the last parse, its result is None.
+    """
+    results = {}
+    for yaml_file in yaml_files:
+        try:
+            results[yaml_file] = parse_file(
+                yaml_file,
+                digests.get(yaml_file),
+                yaml_ast,
+                known_content,
+                max_file_size,
+                time_budget,
+            )
+        except OSError as exception:
+            _LOGGER.error("Unable to parse %s: %s", yaml_file, exception)
+        except UnicodeDecodeError as exception:
+            results[yaml_file] = {
+                "entities": {},
+                "services": {},
+                "error": str(exception),
+                "digest": None,
+                "includes": [],
+            }
+    return results
+
+
+def parse_file(
+    yaml_file,
+    digest=None,
+    yaml_ast=False,
+    known_content=None,
+    max_file_size=0,
+    time_budget=0,
+):
+    """Read the whole file at once and extract entities and services from it.
+
+    Large files are memory-mapped, files larger than max_file_size (bytes)
+    are not read. Return None if the file content digest equals to the given
+    one.
+    """
+    with open(yaml_file, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if max_file_size and size > max_file_size:
+            return skipped_result(f"larger than {max_file_size // 1024} KiB")
+        if size >= PARSER_MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return parse_content(
+                    yaml_file, mm, digest, yaml_ast, known_content, time_budget
+                )
+        return parse_content(
+            yaml_file, f.read(), digest, yaml_ast, known_content, time_budget
+        )
+
 
+def parse_content(
+    yaml_file, content, digest, yaml_ast, known_content=None, time_budget=0
+):
+    """Extract entities and services with their locations from file content.
 
-def get_included_folders(hass):
-    """Gather the list of folders to parse."""
+    The file goes to the extractor registered for its path, e.g. dashboards
+    are parsed as JSON and only YAML files are searched for includes. Files
+    with NUL bytes at the beginning are skipped as binary, extraction is
+    aborted after time_budget seconds.
+    """
+    new_digest = hashlib.blake2b(content, digest_size=16).hexdigest()
+    if new_digest == digest:
+        return None
+    if b"\0" in content[:PARSER_BINARY_SNIFF_SIZE]:
+        return skipped_result("binary content", new_digest)
+    extractor = get_extractor(yaml_file)
+    if known := (known_content or {}).get((extractor.name, new_digest)):
+        return {
+            "entities": known["entities"],
+            "services": known["services"],
+            "error": None,
+            "digest": new_digest,
+            "includes": known["includes"],
+        }
+    text = str(content, "utf-8")
+    # same line breaks as text mode reading with universal newlines
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    deadline = time.monotonic() + time_budget if time_budget else None
+    try:
+        entities, services, includes = extractor.extract(
+            yaml_file, text, yaml_ast, deadline
+        )
+    except TimeoutError:
+        # parsing time depends on load, so neither the content digest nor the
+        # signature of a timed out file are cached
+        return skipped_result(f"not parsed in {time_budget}s", retry=True)
+    return {
+        "entities": entities,
+        "services": services,
+        "error": None,
+        "digest": new_digest,
+        "includes": includes,
+    }
+
+
+def skipped_result(reason, digest=None, retry=False):
+    """Return parse result of a file which was skipped for the reason.
+
+    With retry, the file should be parsed again by the next parse even if it
+    did not change.
+    """
+    result = {
+        "entities": {},
+        "services": {},
+        "error": None,
+        "digest": digest,
+        "includes": [],
+        "skipped": reason,
+    }
+    if retry:
+        result["retry"] = True
+    return result
+
+
+def get_included_folders(hass, options=None):
+    """Gather the list of folders to parse.
+
+    Folders are taken from options if given, e.g. options which are not saved
+    yet, otherwise from the config entry.
+    """
     folders = []
+    if options is None:
+        options = get_entry(hass).data
 
-    for fld in get_config(hass, CONF_INCLUDED_FOLDERS, None):
+    included_folders = to_lists(options, CONF_INCLUDED_FOLDERS)
+    for fld in included_folders:
         folders.append((fld, "**/*.yaml"))
 
-    if get_config(hass, CONF_CHECK_LOVELACE):
+    if get_val(options, CONF_CHECK_LOVELACE):
         folders.append((hass.config.config_dir, ".storage/**/lovelace*"))
 
+    # macros of custom templates are loaded by HA from the config directory,
+    # they are parsed only if the directory is within the included folders
+    templates = os.path.join(hass.config.config_dir, "custom_templates", "")
+    if any(
+        templates.startswith(os.path.join(os.path.normpath(fld), ""))
+        for fld in included_folders
+    ):
+        folders.append((hass.config.config_dir, "custom_templates/**/*.jinja"))
+
     return folders
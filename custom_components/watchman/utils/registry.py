@@ -0,0 +1,133 @@
+"""Lookup table of registry attributes used by ignore rules."""
+
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers import (
+    area_registry as ar,
+    device_registry as dr,
+    entity_registry as er,
+    label_registry as lr,
+)
+
+from .logger import _LOGGER
+from ..const import (
+    DOMAIN,
+    HASS_DATA_REGISTRY_TABLE,
+    REGISTRY_RULE_KEYS,
+)
+
+
+def parse_registry_rules(rules) -> frozenset[str]:
+    """Return normalized `key:value` rules, raise ValueError on a malformed one."""
+    parsed = set()
+    for rule in rules:
+        key, sep, value = rule.partition(":")
+        key = key.strip().lower()
+        value = value.strip().lower()
+        if not sep or not value or key not in REGISTRY_RULE_KEYS:
+            raise ValueError(rule)
+        parsed.add(f"{key}:{value}")
+    return frozenset(parsed)
+
+
+class RegistryTable:
+    """Map entity ids to the registry attributes ignore rules are matched with.
+
+    Every entity of the entity registry gets a set of `key:value` tokens:
+    its integration, entity category, area (the device area unless the
+    entity has its own) and labels of the entity and its device. Areas and
+    labels are added both by id and by lowercased name. An entity is
+    checked against the rules with a single set intersection, whatever
+    the number of rules.
+
+    The table is built on first use. Entity registry changes update the
+    changed entity only, device, area and label registry changes mark the
+    table to be built again.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize table."""
+        self.hass = hass
+        self._table: dict[str, frozenset[str]] | None = None
+
+    @callback
+    def async_listen(self, on_change) -> list[CALLBACK_TYPE]:
+        """Track registry changes, return their cancel handlers.
+
+        on_change is called with the changed entity id, or None if many
+        entities may be affected.
+        """
+
+        @callback
+        def async_on_entity_registry_updated(
+            event: Event[er.EventEntityRegistryUpdatedData],
+        ) -> None:
+            entity_id = event.data["entity_id"]
+            if self._table is not None:
+                self._table.pop(event.data.get("old_entity_id"), None)
+                self._table.pop(entity_id, None)
+                if event.data["action"] != "remove":
+                    self._add_entity(entity_id)
+            on_change(entity_id)
+
+        @callback
+        def async_on_registry_updated(event: Event) -> None:  # pylint: disable=unused-argument
+            self._table = None
+            on_change(None)
+
+        return [
+            self.hass.bus.async_listen(
+                er.EVENT_ENTITY_REGISTRY_UPDATED, async_on_entity_registry_updated
+            ),
+            *(
+                self.hass.bus.async_listen(event_type, async_on_registry_updated)
+                for event_type in (
+                    dr.EVENT_DEVICE_REGISTRY_UPDATED,
+                    ar.EVENT_AREA_REGISTRY_UPDATED,
+                    lr.EVENT_LABEL_REGISTRY_UPDATED,
+                )
+            ),
+        ]
+
+    def get(self, entity_id: str) -> frozenset[str]:
+        """Return tokens of the entity, empty if it is not registered."""
+        if self._table is None:
+            self._build()
+        return self._table.get(entity_id, frozenset())
+
+    def _build(self) -> None:
+        """Build the table from the registries."""
+        self._table = {}
+        for entity_id in er.async_get(self.hass).entities:
+            self._add_entity(entity_id)
+        _LOGGER.debug(f"::registry:: Table built for {len(self._table)} entities")
+
+    def _add_entity(self, entity_id: str) -> None:
+        """Add tokens of a registered entity to the table."""
+        if (entry := er.async_get(self.hass).async_get(entity_id)) is None:
+            return
+        area_registry = ar.async_get(self.hass)
+        label_registry = lr.async_get(self.hass)
+        device = (
+            dr.async_get(self.hass).async_get(entry.device_id)
+            if entry.device_id
+            else None
+        )
+        tokens = {f"integration:{entry.platform}"}
+        if entry.entity_category:
+            tokens.add(f"entity_category:{entry.entity_category.value}")
+        if area_id := entry.area_id or (device.area_id if device else None):
+            tokens.add(f"area:{area_id}")
+            if area := area_registry.async_get_area(area_id):
+                tokens.add(f"area:{area.name.lower()}")
+        for label_id in entry.labels | (device.labels if device else set()):
+            tokens.add(f"label:{label_id}")
+            if label := label_registry.async_get_label(label_id):
+                tokens.add(f"label:{label.name.lower()}")
+        self._table[entity_id] = frozenset(tokens)
+
+
+def get_registry_table(hass: HomeAssistant) -> RegistryTable:
+    """Return registry table of the integration, create it if missing."""
+    if (table := hass.data[DOMAIN].get(HASS_DATA_REGISTRY_TABLE)) is None:
+        table = hass.data[DOMAIN][HASS_DATA_REGISTRY_TABLE] = RegistryTable(hass)
+    return table
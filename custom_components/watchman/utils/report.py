@@ -8,7 +8,7 @@ import time
 from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import HomeAssistantError
 from prettytable import PrettyTable
-from .utils import get_config, get_entity_state, get_entry, is_action
+from .utils import get_config, get_entry, is_action
 from .logger import _LOGGER
 from ..const import (
     CONF_ACTION_NAME,
@@ -21,11 +21,15 @@ from ..const import (
     HASS_DATA_COORDINATOR,
     HASS_DATA_FILES_IGNORED,
     HASS_DATA_FILES_PARSED,
+    HASS_DATA_FILES_REJECTED,
+    HASS_DATA_FILES_SKIPPED,
+    HASS_DATA_FOLDERS_IGNORED,
     HASS_DATA_MISSING_ENTITIES,
     HASS_DATA_MISSING_SERVICES,
     HASS_DATA_PARSE_DURATION,
     HASS_DATA_PARSED_ENTITY_LIST,
     HASS_DATA_PARSED_SERVICE_LIST,
+    HASS_DATA_VALIDATION,
     REPORT_ENTRY_TYPE_ENTITY,
     REPORT_ENTRY_TYPE_SERVICE,
 )
@@ -59,6 +63,9 @@ async def report(hass, render, chunk_size):
     entity_list = hass.data[DOMAIN][HASS_DATA_PARSED_ENTITY_LIST]
     files_parsed = hass.data[DOMAIN][HASS_DATA_FILES_PARSED]
     files_ignored = hass.data[DOMAIN][HASS_DATA_FILES_IGNORED]
+    folders_ignored = hass.data[DOMAIN][HASS_DATA_FOLDERS_IGNORED]
+    files_skipped = hass.data[DOMAIN].get(HASS_DATA_FILES_SKIPPED, 0)
+    files_rejected = hass.data[DOMAIN].get(HASS_DATA_FILES_REJECTED, [])
 
     rep = f"{header} \n"
     if services_missing:
@@ -94,9 +101,21 @@ async def report(hass, render, chunk_size):
     rep += f"\n-== Report created on {report_datetime}\n"
     rep += (
         f"-== Parsed {files_parsed} files in {parse_duration:.2f}s., "
-        f"ignored {files_ignored} files \n"
+        f"ignored {files_ignored} files"
     )
+    if folders_ignored:
+        rep += f" and {folders_ignored} folders"
+    if files_skipped:
+        rep += f", skipped {files_skipped} files outside include graph"
+    rep += " \n"
     rep += f"-== Generated in: {render_duration:.2f}s. Validated in: {check_duration:.2f}s."
+    if summarized := entity_list.summarized + service_list.summarized:
+        # only shown when the occurrence cap or memory budget dropped lines
+        index_size = (entity_list.nbytes + service_list.nbytes) / 1024
+        rep += f"\n-== Index size: {index_size:.0f} KiB"
+        rep += f", occurrences of {summarized} references are summarized"
+    for short_path, reason in files_rejected:
+        rep += f"\n-== Skipped {short_path}: {reason}"
     report_chunks = []
     chunk = ""
     for line in iter(rep.splitlines()):
@@ -130,11 +149,13 @@ def table_renderer(hass, entry_type):
     elif entry_type == REPORT_ENTRY_TYPE_ENTITY:
         entities_missing = hass.data[DOMAIN][HASS_DATA_MISSING_ENTITIES]
         parsed_entity_list = hass.data[DOMAIN][HASS_DATA_PARSED_ENTITY_LIST]
+        entity_states = hass.data[DOMAIN][HASS_DATA_VALIDATION].entity_states
         friendly_names = get_config(hass, CONF_FRIENDLY_NAMES, False)
         header = ["Entity ID", "State", "Location"]
         table.field_names = header
         for entity in entities_missing:
-            state, name = get_entity_state(hass, entity, friendly_names)
+            state, name = entity_states[entity]
+            name = name if friendly_names else None
             table.add_row(
                 [
                     fill(entity, columns_width[0], name),
@@ -162,9 +183,11 @@ def text_renderer(hass, entry_type):
     elif entry_type == REPORT_ENTRY_TYPE_ENTITY:
         entities_missing = hass.data[DOMAIN][HASS_DATA_MISSING_ENTITIES]
         entity_list = hass.data[DOMAIN][HASS_DATA_PARSED_ENTITY_LIST]
+        entity_states = hass.data[DOMAIN][HASS_DATA_VALIDATION].entity_states
         friendly_names = get_config(hass, CONF_FRIENDLY_NAMES, False)
         for entity in entities_missing:
-            state, name = get_entity_state(hass, entity, friendly_names)
+            state, name = entity_states[entity]
+            name = name if friendly_names else None
             entity_col = entity if not name else f"{entity} ('{name}')"
             result += f"{entity_col} [{state}] in: {fill(entity_list[entity], 0)}\n"
 
@@ -176,8 +199,9 @@ def text_renderer(hass, entry_type):
 def fill(data, width, extra=None):
     """Arrange data by table column width."""
     if data and isinstance(data, dict):
-        key, val = next(iter(data.items()))
-        out = f"{key}:{','.join([str(v) for v in val])}"
+        out = " ".join(
+            [f"{key}:{','.join([str(v) for v in val])}" for key, val in data.items()]
+        )
     else:
         out = str(data) if not extra else f"{data} ('{extra}')"
 
@@ -0,0 +1,248 @@
+"""Single-pass scanner of entity and action references in configuration files."""
+
+from functools import lru_cache
+from string import ascii_letters, digits
+import time
+
+from homeassistant.const import Platform
+
+from ..const import (
+    DEFAULT_HA_DOMAINS,
+    PARSER_LINE_MEMO_MAX_LENGTH,
+    PARSER_LINE_MEMO_SIZE,
+    PARSER_STOP_WORDS,
+)
+
+WORD_CHARS = frozenset(ascii_letters + digits + "_")
+NAME_CHARS = WORD_CHARS | {"*"}
+QUOTES = frozenset("\"'")
+# key of a trie node which marks the end of a word
+TERMINAL = ""
+# scan deadline is checked once per this number of scanned lines, lines
+# without `.` are skipped and not counted
+DEADLINE_CHECK_SCANNED_LINES = 1024
+
+
+def build_trie(words):
+    """Build a prefix tree of words from nested dicts."""
+    root = {}
+    for word in words:
+        node = root
+        for char in word:
+            node = node.setdefault(char, {})
+        node[TERMINAL] = True
+    return root
+
+
+def skip_chars(text, pos, end, chars):
+    """Return position of the first char not in chars."""
+    while pos < end and text[pos] in chars:
+        pos += 1
+    return pos
+
+
+def skip_whitespace(text, pos, end):
+    """Return position of the first non-whitespace char."""
+    while pos < end and text[pos].isspace():
+        pos += 1
+    return pos
+
+
+class ReferenceScanner:
+    """Find entity and action references line by line in linear time.
+
+    The scanner gives the same results as the former regex heuristics:
+    - lines starting with a stop word (e.g. `description:`) and text after `#`
+      are ignored
+    - entity is `domain.name`, optionally prefixed with `states.`, preceded by
+      a whitespace, a quote or the line start, or by a `key:` which precedes
+      them; it is skipped when the key is `service:`, the name contains `*` or
+      ends with `.yaml`
+    - action is `domain.name` which follows `service:` or `action:`
+    Lines without `.` are never looked at, known domains are recognized with
+    a trie, so every char of a line is examined a constant number of times.
+    References of a line stripped of surrounding whitespace are memoized in
+    an LRU cache of memo_size lines, since dashboards and packages repeat
+    lines like `entity: sensor.x` a lot. Lines longer than
+    PARSER_LINE_MEMO_MAX_LENGTH are scanned directly, so that they neither
+    evict short lines nor keep large strings in the memo.
+    """
+
+    def __init__(self, domains, stop_words, memo_size=PARSER_LINE_MEMO_SIZE):
+        """Compile the scanner for given domains and stop words."""
+        self._domains = build_trie(domains)
+        self._reversed_domains = build_trie([d[::-1] for d in domains])
+        self._stop_words = tuple(f"{w}:" for w in stop_words)
+        self._scan_memo = lru_cache(maxsize=memo_size)(self._scan_stripped_line)
+
+    def scan(self, text, deadline=None):
+        """Return entities and actions found in text with their line numbers.
+
+        Raise TimeoutError if the scan is not finished by deadline, a
+        time.monotonic() value.
+        """
+        entities = {}
+        services = {}
+        lineno = 1
+        counted = 0
+        scanned = 0
+        pos = text.find(".")
+        while pos != -1:
+            scanned += 1
+            if (
+                deadline
+                and not scanned % DEADLINE_CHECK_SCANNED_LINES
+                and time.monotonic() > deadline
+            ):
+                raise TimeoutError
+            start = text.rfind("\n", 0, pos) + 1
+            end = text.find("\n", pos)
+            if end == -1:
+                end = len(text)
+            lineno += text.count("\n", counted, start)
+            counted = start
+            line = text[start:end].strip()
+            if len(line) > PARSER_LINE_MEMO_MAX_LENGTH:
+                line_entities, line_services = self._scan_stripped_line(line)
+            else:
+                line_entities, line_services = self._scan_memo(line)
+            for entity in line_entities:
+                entities.setdefault(entity, []).append(lineno)
+            for service in line_services:
+                services.setdefault(service, []).append(lineno)
+            pos = text.find(".", end)
+        return entities, services
+
+    def memo_info(self):
+        """Return hits, misses, maxsize and currsize of the line memo."""
+        return self._scan_memo.cache_info()
+
+    def _scan_stripped_line(self, line):
+        """Return entities and actions of a line, repeated per occurrence."""
+        entities = {}
+        services = {}
+        self._scan_line(line, 0, len(line), 0, entities, services)
+        return (
+            tuple(e for e, lines in entities.items() for _ in lines),
+            tuple(s for s, lines in services.items() for _ in lines),
+        )
+
+    def is_entity(self, text):
+        """Return True if the whole text is an entity id of a known domain."""
+        match = self._match_domain(text, 0, len(text))
+        return match is not None and match[1] == len(text) and "*" not in text
+
+    def _scan_line(self, text, start, end, lineno, entities, services):
+        """Collect references from the line text[start:end]."""
+        if text.startswith(self._stop_words, skip_whitespace(text, start, end), end):
+            return
+        if (comment := text.find("#", start, end)) != -1:
+            end = comment
+            while end > start and text[end - 1].isspace():
+                end -= 1
+        if text.find(".", start, end) == -1:
+            return
+        self._scan_services(text, start, end, lineno, services)
+        self._scan_entities(text, start, end, lineno, entities)
+
+    def _scan_services(self, text, start, end, lineno, services):
+        """Collect actions which follow `service:` or `action:` keys."""
+        service_key = text.find("service:", start, end)
+        action_key = text.find("action:", start, end)
+        while service_key != -1 or action_key != -1:
+            if action_key == -1 or (service_key != -1 and service_key < action_key):
+                key, value = service_key, service_key + 8
+            else:
+                key, value = action_key, action_key + 7
+            value = skip_whitespace(text, value, end)
+            dot = skip_chars(text, value, end, WORD_CHARS)
+            pos = key + 1
+            if dot < end and text[dot] == ".":
+                value_end = skip_chars(text, dot + 1, end, WORD_CHARS)
+                if value_end > dot + 1:
+                    services.setdefault(text[value:value_end], []).append(lineno)
+                    pos = value_end
+            if service_key != -1 and service_key < pos:
+                service_key = text.find("service:", pos, end)
+            if action_key != -1 and action_key < pos:
+                action_key = text.find("action:", pos, end)
+
+    def _scan_entities(self, text, start, end, lineno, entities):
+        """Collect entities, trying candidate start positions left to right."""
+        last_domain = self._find_last_domain(text, start, end)
+        pos = start
+        while pos <= last_domain:
+            prev = text[pos - 1] if pos > start else " "
+            if prev in QUOTES or prev.isspace():
+                if match := self._match_entity(text, pos, end):
+                    key, value, pos = match
+                    if key != "service:" and "*" not in value:
+                        if not value.endswith(".yaml"):
+                            entities.setdefault(value, []).append(lineno)
+                    continue
+                if pos < end and text[pos].isspace():
+                    # next positions within the whitespace run give the same result
+                    pos = skip_whitespace(text, pos, end)
+                    continue
+            pos += 1
+
+    def _find_last_domain(self, text, start, end):
+        """Return start of the last known domain followed by a dot, or -1."""
+        last_domain = -1
+        dot = text.find(".", start, end)
+        while dot != -1:
+            node = self._reversed_domains
+            pos = dot - 1
+            while pos >= start and (node := node.get(text[pos])) is not None:
+                if TERMINAL in node:
+                    last_domain = max(last_domain, pos)
+                    break
+                pos -= 1
+            dot = text.find(".", dot + 1, end)
+        return last_domain
+
+    def _match_entity(self, text, pos, end):
+        """Match an entity reference starting at pos.
+
+        Return a tuple (key, entity, end of match) or None. The key is the
+        `key:` prefix of the entity, if any.
+        """
+        key_end = skip_whitespace(text, skip_chars(text, pos, end, WORD_CHARS), end)
+        if key_end < end and text[key_end] == ":":
+            value_start = skip_whitespace(text, key_end + 1, end)
+            if match := self._match_reference(text, value_start, end):
+                return text[pos : key_end + 1], *match
+        if match := self._match_reference(text, skip_whitespace(text, pos, end), end):
+            return None, *match
+        return None
+
+    def _match_reference(self, text, pos, end):
+        """Match `domain.name`, optionally prefixed with `states` and any char."""
+        if pos + 6 < end and text.startswith("states", pos):
+            if match := self._match_domain(text, pos + 7, end):
+                return match
+        return self._match_domain(text, pos, end)
+
+    def _match_domain(self, text, pos, end):
+        """Match a known domain followed by a dot and a name."""
+        node = self._domains
+        start = pos
+        while pos < end:
+            node = node.get(text[pos])
+            if node is None:
+                return None
+            pos += 1
+            if TERMINAL in node and pos < end and text[pos] == ".":
+                name_end = skip_chars(text, pos + 1, end, NAME_CHARS)
+                if name_end == pos + 1:
+                    return None
+                return text[start:name_end], name_end
+        return None
+
+
+def create_scanner():
+    """Return scanner of Home Assistant domains with its own line memo."""
+    return ReferenceScanner([*Platform, *DEFAULT_HA_DOMAINS], PARSER_STOP_WORDS)
+
+
+SCANNER = create_scanner()
@@ -8,29 +8,38 @@ import os
 from typing import Any
 from types import MappingProxyType
 
-from homeassistant.exceptions import HomeAssistantError
-from homeassistant.core import HomeAssistant, split_entity_id
+from homeassistant.core import HomeAssistant
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.helpers import entity_registry as er
 
 from .logger import _LOGGER, INDENT
+from .registry import parse_registry_rules
 from ..const import (
     CONF_CHECK_LOVELACE,
     CONF_IGNORED_FILES,
     CONF_INCLUDED_FOLDERS,
     CONF_REPORT_PATH,
+    CONF_PARSER_INCLUDE_GRAPH,
+    CONF_PARSER_MEMORY_BUDGET,
+    CONF_PARSER_WATCH_FILES,
+    CONF_PARSER_GIT_CHANGES,
+    CONF_PARSER_MAX_FILE_SIZE,
+    CONF_PARSER_FILE_TIME_BUDGET,
+    CONF_PARSER_BACKGROUND_RESCAN,
+    CONF_PARSER_WORKERS,
+    CONF_PARSER_YAML_AST,
     CONF_SECTION_APPEARANCE_LOCATION,
+    CONF_SECTION_PARSER,
     CONF_STARTUP_DELAY,
-    DOMAIN,
     DOMAIN_DATA,
     CONF_HEADER,
     CONF_IGNORED_ITEMS,
     CONF_IGNORED_STATES,
+    CONF_IGNORED_REGISTRY,
     CONF_COLUMNS_WIDTH,
     CONF_FRIENDLY_NAMES,
-    HASS_DATA_PARSED_ENTITY_LIST,
-    HASS_DATA_PARSED_SERVICE_LIST,
     DEFAULT_OPTIONS,
+    PARSER_SKIPPED_FOLDERS,
+    PARSER_SKIPPED_ROOT_FOLDERS,
 )
 
 
@@ -80,7 +89,12 @@ def get_config(hass: HomeAssistant, key: str, default: Any | None = None) -> Any
 
     assert isinstance(entry, ConfigEntry)
 
-    if key in [CONF_INCLUDED_FOLDERS, CONF_IGNORED_ITEMS, CONF_IGNORED_FILES]:
+    if key in [
+        CONF_INCLUDED_FOLDERS,
+        CONF_IGNORED_ITEMS,
+        CONF_IGNORED_FILES,
+        CONF_IGNORED_REGISTRY,
+    ]:
         return to_lists(entry.data, key)
 
     if key in [CONF_IGNORED_STATES, CONF_CHECK_LOVELACE, CONF_STARTUP_DELAY]:
@@ -93,6 +107,19 @@ def get_config(hass: HomeAssistant, key: str, default: Any | None = None) -> Any
         else:
             return get_val(entry.data, key, section_name)
 
+    if key in [
+        CONF_PARSER_WORKERS,
+        CONF_PARSER_YAML_AST,
+        CONF_PARSER_INCLUDE_GRAPH,
+        CONF_PARSER_MEMORY_BUDGET,
+        CONF_PARSER_WATCH_FILES,
+        CONF_PARSER_GIT_CHANGES,
+        CONF_PARSER_MAX_FILE_SIZE,
+        CONF_PARSER_FILE_TIME_BUDGET,
+        CONF_PARSER_BACKGROUND_RESCAN,
+    ]:
+        return get_val(entry.data, key, CONF_SECTION_PARSER)
+
     assert False, "Unknown key {}".format(key)
 
 
@@ -107,22 +134,214 @@ async def async_is_valid_path(path) -> bool:
     return is_valid
 
 
-async def async_get_next_file(folder_tuples, ignored_files):
-    """Return next file from scan queue."""
+def get_ignored_files_matchers(ignored_files):
+    """Compile ignored_files rules to the regexps matching files and folders.
+
+    A folder matches when a rule ending with `*` matches the folder path followed
+    by a path separator, so that everything inside the folder is ignored as well.
+    """
     if not ignored_files:
-        ignored_files = ""
-    else:
-        ignored_files = "|".join([f"({fnmatch.translate(f)})" for f in ignored_files])
-    ignored_files_re = re.compile(ignored_files)
+        return None, None
+    files_re = re.compile(
+        "|".join([f"({fnmatch.translate(f)})" for f in ignored_files])
+    )
+    folder_rules = [f[:-1] for f in ignored_files if f.endswith("*")]
+    folders_re = (
+        re.compile("|".join([f"({fnmatch.translate(f)})" for f in folder_rules]))
+        if folder_rules
+        else None
+    )
+    return files_re, folders_re
+
+
+def split_glob_pattern(folder_name, glob_pattern):
+    """Split glob pattern to the folder to start scan from, recursion flag and file name pattern."""
+    parts = glob_pattern.split("/")
+    name_pattern = parts.pop()
+    recursive = "**" in parts
+    prefix = parts[: parts.index("**")] if recursive else parts
+    return os.path.normpath(os.path.join(folder_name, *prefix)), recursive, name_pattern
+
+
+def scan_files(folder_tuples, ignored_files):
+    """Walk folders and return configuration files matching the glob patterns.
+
+    Blocking function, should be run in the executor. Folders matching ignored_files
+    rules or skipped as service folders are not descended into. Symlinked
+    folders are followed, but every folder is walked once per glob pattern, so
+    overlapping folders and symlink loops do not yield the same file twice, nor
+    do hard links to the same file.
+    Return a tuple (files, ignored_folders), where files is a list of
+    (path, ignored, signature) tuples.
+    """
+    files_re, folders_re = get_ignored_files_matchers(ignored_files)
+    files = []
+    ignored_folders = []
+    # (st_dev, st_ino) of files and (st_dev, st_ino, pattern) of walked folders
+    seen_files = set()
+    seen_folders = set()
     for folder_name, glob_pattern in folder_tuples:
         _LOGGER.debug(
             f"{INDENT}Scan folder {folder_name} with pattern {glob_pattern} for configuration files"
         )
-        async for filename in anyio.Path(folder_name).glob(glob_pattern):
-            yield (
-                str(filename),
-                (ignored_files and ignored_files_re.match(str(filename))),
-            )
+        root, recursive, name_pattern = split_glob_pattern(folder_name, glob_pattern)
+        name_re = re.compile(fnmatch.translate(name_pattern))
+        pattern_key = (recursive, name_pattern)
+        folders = [root]
+        while folders:
+            folder = folders.pop()
+            try:
+                stat = os.stat(folder)
+                if (stat.st_dev, stat.st_ino, pattern_key) in seen_folders:
+                    _LOGGER.debug(f"{INDENT}Folder {folder} is already scanned")
+                    continue
+                seen_folders.add((stat.st_dev, stat.st_ino, pattern_key))
+                with os.scandir(folder) as it:
+                    entries = sorted(it, key=lambda e: e.name)
+            except FileNotFoundError:
+                continue
+            except OSError as exception:
+                _LOGGER.error("Unable to scan folder %s: %s", folder, exception)
+                continue
+            subfolders = []
+            for entry in entries:
+                if entry.is_dir():
+                    if not recursive:
+                        continue
+                    if is_skipped_folder(entry.path, (root,)) or (
+                        folders_re and folders_re.match(entry.path + os.sep)
+                    ):
+                        ignored_folders.append(entry.path)
+                    else:
+                        subfolders.append(entry.path)
+                elif name_re.match(entry.name) and entry.is_file():
+                    if files_re and files_re.match(entry.path):
+                        files.append((entry.path, True, None))
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except OSError as exception:
+                        _LOGGER.error("Unable to parse %s: %s", entry.path, exception)
+                        continue
+                    if (stat.st_dev, stat.st_ino) in seen_files:
+                        _LOGGER.debug(f"{INDENT}File {entry.path} is already scanned")
+                        continue
+                    seen_files.add((stat.st_dev, stat.st_ino))
+                    files.append((entry.path, False, get_signature(stat)))
+            folders.extend(reversed(subfolders))
+    return files, ignored_folders
+
+
+def rescan_files(scanned_files, changed_files, folder_tuples, ignored_files):
+    """Update the result of scan_files with changed files only.
+
+    Blocking function, should be run in the executor. changed_files are paths
+    which were modified, created or deleted since scanned_files were taken,
+    new paths are added only if scan_files would find them. Return a tuple
+    (files, ignored_folders), same as scan_files does.
+    """
+    files_re, folders_re = get_ignored_files_matchers(ignored_files)
+    glob_matchers = get_glob_matchers(folder_tuples)
+    files, ignored_folders = scanned_files
+    known_files = {path for path, _, _ in files}
+
+    def scan_file(path):
+        if files_re and files_re.match(path):
+            return (path, True, None)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        except OSError as exception:
+            _LOGGER.error("Unable to parse %s: %s", path, exception)
+            return None
+        return (path, False, get_signature(stat))
+
+    rescanned_files = []
+    for file in files:
+        if file[0] in changed_files:
+            file = scan_file(file[0])
+        if file:
+            rescanned_files.append(file)
+    for path in sorted(set(changed_files) - known_files):
+        if not is_scanned_path(path, glob_matchers, folders_re):
+            continue
+        if file := scan_file(path):
+            rescanned_files.append(file)
+    return rescanned_files, ignored_folders
+
+
+def get_glob_matchers(folder_tuples):
+    """Return (root, recursive, file name regexp) tuples of the folder glob patterns."""
+    matchers = []
+    for folder_name, glob_pattern in folder_tuples:
+        root, recursive, name_pattern = split_glob_pattern(folder_name, glob_pattern)
+        matchers.append((root, recursive, re.compile(fnmatch.translate(name_pattern))))
+    return matchers
+
+
+def is_scanned_path(path, glob_matchers, folders_re):
+    """Return True if scan_files would find a file at path, ignored or not."""
+    folder, name = os.path.split(path)
+    for root, recursive, name_re in glob_matchers:
+        if not name_re.match(name):
+            continue
+        if folder == root:
+            return True
+        if not recursive or not folder.startswith(root + os.sep):
+            continue
+        subfolder = root
+        for part in folder[len(root) + 1 :].split(os.sep):
+            subfolder = os.path.join(subfolder, part)
+            if is_skipped_folder(subfolder, (root,)) or (
+                folders_re and folders_re.match(subfolder + os.sep)
+            ):
+                break
+        else:
+            return True
+    return False
+
+
+def is_skipped_folder(folder, roots):
+    """Return True if folder is a service folder which is never scanned.
+
+    Folders listed in PARSER_SKIPPED_FOLDERS are skipped anywhere, the ones
+    listed in PARSER_SKIPPED_ROOT_FOLDERS only right in one of the included
+    folder roots.
+    """
+    parent, name = os.path.split(folder)
+    return name in PARSER_SKIPPED_FOLDERS or (
+        name in PARSER_SKIPPED_ROOT_FOLDERS and parent in roots
+    )
+
+
+def is_parsed_path(path, folder_tuples, ignored_files):
+    """Return True if scan_files would find a file at path and it is not ignored."""
+    files_re, folders_re = get_ignored_files_matchers(ignored_files)
+    if files_re and files_re.match(path):
+        return False
+    return is_scanned_path(path, get_glob_matchers(folder_tuples), folders_re)
+
+
+def get_signature(stat):
+    """Return signature of a file which changes when the file is modified."""
+    return [stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns]
+
+
+def get_modified_files(files):
+    """Return paths of files which signature differs from the given one.
+
+    Blocking function, should be run in the executor. files is a list of
+    (path, signature) tuples, removed files are reported as modified too.
+    """
+    modified_files = set()
+    for path, signature in files:
+        try:
+            if get_signature(os.stat(path)) != signature:
+                modified_files.add(path)
+        except OSError:
+            modified_files.add(path)
+    return modified_files
 
 
 def is_action(hass, entry):
@@ -133,74 +352,12 @@ def is_action(hass, entry):
     return hass.services.has_service(domain, service)
 
 
-def get_entity_state(hass, entry, friendly_names=False):
-    """Return entity state or 'missing' if entity does not extst."""
-    entity_state = hass.states.get(entry)
-    entity_registry = er.async_get(hass)
-    name = None
-    if entity_state and entity_state.attributes.get("friendly_name", None):
-        if friendly_names:
-            name = entity_state.name
-
-    if not entity_state:
-        state = "missing"
-        if regentry := entity_registry.async_get(entry):
-            if regentry.disabled_by:
-                state = "disabled"
-    else:
-        state = str(entity_state.state).replace("unavailable", "unavail")
-        if split_entity_id(entry)[0] == "input_button" and state == "unknown":
-            state = "available"
-
-    return state, name
-
-
-def renew_missing_actions_list(hass):
-    """Update list of missing actions when an action gets registered or removed."""
-    services_missing = {}
-    _LOGGER.debug("::check_services:: Triaging list of found actions")
-    if "missing" in get_config(hass, CONF_IGNORED_STATES, []):
-        _LOGGER.debug(
-            f"{INDENT}MISSING state set as ignored in config, so final list of reported actions is empty."
-        )
-        return services_missing
-    if (
-        DOMAIN not in hass.data
-        or HASS_DATA_PARSED_SERVICE_LIST not in hass.data[DOMAIN]
-    ):
-        raise HomeAssistantError("Service list not found")
-    parsed_service_list = hass.data[DOMAIN][HASS_DATA_PARSED_SERVICE_LIST]
-    for entry, occurrences in parsed_service_list.items():
-        if not is_action(hass, entry):
-            services_missing[entry] = occurrences
-            _LOGGER.debug(f"{INDENT}service {entry} added to the report")
-    return services_missing
-
-
-def renew_missing_entities_list(hass):
-    """Update list of missing entities when a service from a config file changed its state."""
-    _LOGGER.debug("::check_entities:: Triaging list of found entities")
-
-    ignored_states = [
-        "unavail" if s == "unavailable" else s
-        for s in get_config(hass, CONF_IGNORED_STATES, [])
-    ]
-    if DOMAIN not in hass.data or HASS_DATA_PARSED_ENTITY_LIST not in hass.data[DOMAIN]:
-        _LOGGER.error(f"{INDENT}Entity list not found")
-        raise Exception("Entity list not found")
-    parsed_entity_list = hass.data[DOMAIN][HASS_DATA_PARSED_ENTITY_LIST]
-    entities_missing = {}
-    for entry, occurrences in parsed_entity_list.items():
-        if is_action(hass, entry):  # this is a service, not entity
-            _LOGGER.debug(f"{INDENT}entry {entry} is service, skipping")
-            continue
-        state, _ = get_entity_state(hass, entry)
-        if state in ignored_states:
-            _LOGGER.debug(
-                f"{INDENT}entry {entry} with state {state} skipped due to ignored_states"
-            )
-            continue
-        if state in ["missing", "unknown", "unavail", "disabled"]:
-            entities_missing[entry] = occurrences
-            _LOGGER.debug(f"{INDENT}entry {entry} added to the report")
-    return entities_missing
+def get_registry_rules(hass):
+    """Return registry ignore rules, malformed ones are skipped."""
+    rules = set()
+    for rule in get_config(hass, CONF_IGNORED_REGISTRY, []):
+        try:
+            rules |= parse_registry_rules([rule])
+        except ValueError:
+            _LOGGER.warning("Registry ignore rule `%s` is malformed, skipping", rule)
+    return frozenset(rules)
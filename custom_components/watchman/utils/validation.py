@@ -0,0 +1,112 @@
+"""Validation of parsed references against the running Home Assistant."""
+
+from dataclasses import dataclass
+import time
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import entity_registry as er
+
+from .logger import _LOGGER, INDENT
+from .registry import get_registry_table
+from .utils import get_config, get_registry_rules
+from ..const import (
+    CONF_IGNORED_STATES,
+    DOMAIN,
+    HASS_DATA_PARSED_ENTITY_LIST,
+    HASS_DATA_PARSED_SERVICE_LIST,
+)
+
+
+@dataclass(frozen=True)
+class ValidationResult:
+    """Missing references found by a single validation pass."""
+
+    # missing entity id -> its occurrences in the configuration
+    entities_missing: dict[str, Any]
+    # missing action id -> its occurrences in the configuration
+    services_missing: dict[str, Any]
+    # missing entity id -> (state, friendly name or None)
+    entity_states: dict[str, tuple[str, str | None]]
+    # time spent on validation, seconds
+    duration: float
+
+
+def validate(hass: HomeAssistant) -> ValidationResult:
+    """Classify parsed entities and actions in one pass.
+
+    Registered actions are taken once into a set of `domain.action` ids,
+    options are read once, states and the entity registry are looked up
+    through their mappings, so every reference costs a few dict lookups.
+    The result is reused by sensors and report renderers until the next
+    refresh.
+    """
+    start_time = time.time()
+    if (
+        DOMAIN not in hass.data
+        or HASS_DATA_PARSED_SERVICE_LIST not in hass.data[DOMAIN]
+    ):
+        raise HomeAssistantError("Service list not found")
+    if HASS_DATA_PARSED_ENTITY_LIST not in hass.data[DOMAIN]:
+        _LOGGER.error(f"{INDENT}Entity list not found")
+        raise HomeAssistantError("Entity list not found")
+    parsed_service_list = hass.data[DOMAIN][HASS_DATA_PARSED_SERVICE_LIST]
+    parsed_entity_list = hass.data[DOMAIN][HASS_DATA_PARSED_ENTITY_LIST]
+
+    # snapshots of the current state, taken once per validation
+    services = {
+        f"{domain}.{service}"
+        for domain, domain_services in hass.services.async_services().items()
+        for service in domain_services
+    }
+    get_state = hass.states.get
+    registry_entities = er.async_get(hass).entities
+    ignored_states = {
+        "unavail" if s == "unavailable" else s
+        for s in get_config(hass, CONF_IGNORED_STATES, [])
+    }
+    registry_rules = get_registry_rules(hass)
+    registry_table = get_registry_table(hass) if registry_rules else None
+
+    _LOGGER.debug("::validate:: Triaging list of found actions")
+    services_missing = {}
+    if "missing" in ignored_states:
+        _LOGGER.debug(
+            f"{INDENT}MISSING state set as ignored in config, so final list of reported actions is empty."
+        )
+    else:
+        for entry in parsed_service_list:
+            if entry.lower() not in services:
+                services_missing[entry] = parsed_service_list[entry]
+
+    _LOGGER.debug("::validate:: Triaging list of found entities")
+    entities_missing = {}
+    entity_states = {}
+    for entry in parsed_entity_list:
+        if entry.lower() in services:  # this is a service, not entity
+            continue
+        if registry_table and not registry_rules.isdisjoint(registry_table.get(entry)):
+            continue
+        name = None
+        if (entity_state := get_state(entry)) is None:
+            state = "missing"
+            if (regentry := registry_entities.get(entry)) and regentry.disabled_by:
+                state = "disabled"
+        else:
+            state = str(entity_state.state).replace("unavailable", "unavail")
+            if state == "unknown" and entry.startswith("input_button."):
+                state = "available"
+            if entity_state.attributes.get("friendly_name"):
+                name = entity_state.name
+        if state in ignored_states:
+            continue
+        if state in ["missing", "unknown", "unavail", "disabled"]:
+            entities_missing[entry] = parsed_entity_list[entry]
+            entity_states[entry] = (state, name)
+
+    duration = time.time() - start_time
+    _LOGGER.debug(
+        f"::validate:: Found {len(entities_missing)} missing entities and {len(services_missing)} missing actions in {duration:.3f}s"
+    )
+    return ValidationResult(entities_missing, services_missing, entity_states, duration)
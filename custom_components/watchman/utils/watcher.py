@@ -0,0 +1,306 @@
+"""Watcher of configuration files changes."""
+
+from collections.abc import Awaitable, Callable
+import ctypes
+from datetime import timedelta
+import os
+import struct
+import sys
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later, async_track_time_interval
+
+from .logger import _LOGGER
+from .utils import (
+    get_glob_matchers,
+    get_ignored_files_matchers,
+    is_scanned_path,
+    is_skipped_folder,
+    scan_files,
+)
+from ..const import WATCHER_BATCH_DELAY, WATCHER_POLL_INTERVAL
+
+# inotify(7) event masks
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+WATCH_MASK = (
+    IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_ONLYDIR
+)
+# struct inotify_event without the name which follows it
+EVENT_HEADER = struct.Struct("iIII")
+READ_SIZE = 64 * 1024
+
+
+class Inotify:
+    """Minimal inotify binding over libc, Linux only."""
+
+    def __init__(self) -> None:
+        """Create non-blocking inotify instance, raise OSError if not available."""
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is available on Linux only")
+        # symbols of the C library linked to the interpreter, glibc or musl
+        libc = ctypes.CDLL(None, use_errno=True)
+        try:
+            self._init = libc.inotify_init1
+            self._add_watch = libc.inotify_add_watch
+        except AttributeError as exception:
+            raise OSError("inotify is not supported by the C library") from exception
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = self._init(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+
+    def add_watch(self, path: str, mask: int) -> int:
+        """Watch folder, return the watch descriptor."""
+        wd = self._add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno), path)
+        return wd
+
+    def read_events(self) -> list[tuple[int, int, str]]:
+        """Return pending events as (watch descriptor, mask, name) tuples."""
+        events = []
+        while True:
+            try:
+                data = os.read(self.fd, READ_SIZE)
+            except BlockingIOError:
+                return events
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+                offset += EVENT_HEADER.size
+                name = os.fsdecode(data[offset : offset + length].rstrip(b"\0"))
+                offset += length
+                events.append((wd, mask, name))
+
+    def close(self) -> None:
+        """Close inotify instance, all watches are removed."""
+        os.close(self.fd)
+
+
+def add_watch(inotify: Inotify, folder: str, watches: dict[int, str]) -> None:
+    """Watch folder and remember its descriptor, skip folders which are gone."""
+    try:
+        watches[inotify.add_watch(folder, WATCH_MASK)] = folder
+    except FileNotFoundError:
+        pass
+
+
+class FileWatcher:
+    """Watch configuration files and report their changes in batches.
+
+    Included folders are watched with inotify, if it is not available files
+    are polled every WATCHER_POLL_INTERVAL seconds. Changes of files which do
+    not match the folder glob patterns or match ignored_files rules are
+    dropped, the rest are collected for WATCHER_BATCH_DELAY seconds and passed
+    to on_change as a set of paths. on_change receives None if changed files
+    are unknown, e.g. a folder was added or the inotify queue overflowed, so
+    all files should be scanned again.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        folder_tuples: list[tuple[str, str]],
+        ignored_files: list[str] | None,
+        on_change: Callable[[set[str] | None], Awaitable[None]],
+    ) -> None:
+        """Initialize watcher."""
+        self.hass = hass
+        self._folder_tuples = folder_tuples
+        self._ignored_files = ignored_files
+        self._on_change = on_change
+        self._patterns = get_glob_matchers(folder_tuples)
+        self._roots = {root for root, _, _ in self._patterns}
+        self._files_re, self._folders_re = get_ignored_files_matchers(ignored_files)
+        self._inotify: Inotify | None = None
+        self._watches: dict[int, str] = {}
+        self._snapshot: dict[str, list[int]] = {}
+        self._changed_files: set[str] = set()
+        self._rescan = False
+        self._cancel_batch = None
+        self._cancel_poll = None
+
+    async def async_start(self) -> None:
+        """Start watching files."""
+        try:
+            self._inotify, self._watches = await self.hass.async_add_executor_job(
+                self._start_inotify
+            )
+        except OSError as exception:
+            _LOGGER.info(
+                "Unable to watch configuration files with inotify (%s), poll them every %ss instead",
+                exception,
+                WATCHER_POLL_INTERVAL,
+            )
+            self._snapshot = await self.hass.async_add_executor_job(self._take_snapshot)
+            self._cancel_poll = async_track_time_interval(
+                self.hass, self._async_poll, timedelta(seconds=WATCHER_POLL_INTERVAL)
+            )
+            return
+        self.hass.loop.add_reader(self._inotify.fd, self._read_events)
+        _LOGGER.debug(f"::watcher:: Watching {len(self._watches)} folders")
+
+    @callback
+    def stop(self) -> None:
+        """Stop watching files."""
+        if self._cancel_batch:
+            self._cancel_batch()
+            self._cancel_batch = None
+        if self._cancel_poll:
+            self._cancel_poll()
+            self._cancel_poll = None
+        if self._inotify:
+            self.hass.loop.remove_reader(self._inotify.fd)
+            self._inotify.close()
+            self._inotify = None
+
+    def _start_inotify(self) -> tuple[Inotify, dict[int, str]]:
+        """Create inotify instance and watch included folders.
+
+        Runs in the executor, the instance is not used by the loop yet.
+        """
+        inotify = Inotify()
+        watches: dict[int, str] = {}
+        try:
+            for root, _, _ in self._patterns:
+                for folder in self._find_folders(root):
+                    add_watch(inotify, folder, watches)
+        except OSError:
+            # e.g. fs.inotify.max_user_watches limit reached
+            inotify.close()
+            raise
+        return inotify, watches
+
+    def _find_folders(self, folder: str) -> list[str]:
+        """Return folder and its subfolders which are scanned for files.
+
+        Blocking function, should be run in the executor.
+        """
+        seen_folders = set()
+        found_folders = []
+        folders = [folder]
+        while folders:
+            folder = folders.pop()
+            try:
+                stat = os.stat(folder)
+                if (stat.st_dev, stat.st_ino) in seen_folders:
+                    continue
+                seen_folders.add((stat.st_dev, stat.st_ino))
+                with os.scandir(folder) as it:
+                    entries = list(it)
+            except OSError:
+                # folder was removed or is not readable, it is not scanned either
+                continue
+            found_folders.append(folder)
+            if not self._is_recursive(folder):
+                continue
+            for entry in entries:
+                if entry.is_dir() and not self._is_ignored_folder(entry):
+                    folders.append(entry.path)
+        return found_folders
+
+    async def _async_watch_new_folder(self, inotify: Inotify, folder: str) -> None:
+        """Watch folder which was created or moved to a watched folder.
+
+        Folders are walked in the executor, watches are added on the loop, so
+        they never race with reading events or with stop().
+        """
+        folders = await self.hass.async_add_executor_job(self._find_folders, folder)
+        if self._inotify is not inotify:
+            # watcher was stopped meanwhile, its descriptor may be reused
+            return
+        try:
+            for path in folders:
+                add_watch(inotify, path, self._watches)
+        except OSError as exception:
+            _LOGGER.warning("Unable to watch folder %s: %s", folder, exception)
+
+    def _is_recursive(self, folder: str) -> bool:
+        """Return True if subfolders of folder are scanned for files."""
+        return any(
+            recursive and (folder == root or folder.startswith(root + os.sep))
+            for root, recursive, _ in self._patterns
+        )
+
+    def _is_ignored_folder(self, entry: os.DirEntry) -> bool:
+        """Return True if folder is not scanned for files."""
+        return is_skipped_folder(entry.path, self._roots) or bool(
+            self._folders_re and self._folders_re.match(entry.path + os.sep)
+        )
+
+    def _is_watched(self, path: str) -> bool:
+        """Return True if path is a configuration file which is not ignored."""
+        if self._files_re and self._files_re.match(path):
+            return False
+        return is_scanned_path(path, self._patterns, self._folders_re)
+
+    @callback
+    def _read_events(self) -> None:
+        """Collect changed files reported by inotify."""
+        for wd, mask, name in self._inotify.read_events():
+            if mask & IN_Q_OVERFLOW:
+                self._rescan = True
+            elif mask & IN_IGNORED:
+                # folder was deleted
+                self._watches.pop(wd, None)
+            elif (folder := self._watches.get(wd)) is None:
+                continue
+            elif mask & IN_ISDIR:
+                path = os.path.join(folder, name)
+                if not self._is_recursive(folder) or is_skipped_folder(
+                    path, self._roots
+                ):
+                    continue
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    self.hass.async_create_background_task(
+                        self._async_watch_new_folder(self._inotify, path),
+                        "watchman_watch_folder",
+                    )
+                # files of added or removed folder are not known
+                self._rescan = True
+            elif self._is_watched(path := os.path.join(folder, name)):
+                self._changed_files.add(path)
+        self._schedule_batch()
+
+    async def _async_poll(self, now) -> None:  # pylint: disable=unused-argument
+        """Collect files changed since the previous poll."""
+        snapshot = await self.hass.async_add_executor_job(self._take_snapshot)
+        for path in self._snapshot.keys() | snapshot.keys():
+            if self._snapshot.get(path) != snapshot.get(path):
+                self._changed_files.add(path)
+        self._snapshot = snapshot
+        self._schedule_batch()
+
+    def _take_snapshot(self) -> dict[str, list[int]]:
+        """Return signatures of watched files."""
+        files, _ = scan_files(self._folder_tuples, self._ignored_files)
+        return {path: signature for path, ignored, signature in files if not ignored}
+
+    @callback
+    def _schedule_batch(self) -> None:
+        """Report changes once the batch delay elapses."""
+        if (self._changed_files or self._rescan) and not self._cancel_batch:
+            self._cancel_batch = async_call_later(
+                self.hass, WATCHER_BATCH_DELAY, self._async_report_changes
+            )
+
+    async def _async_report_changes(self, now) -> None:  # pylint: disable=unused-argument
+        """Pass collected changes to the handler."""
+        self._cancel_batch = None
+        changed_files = None if self._rescan else self._changed_files
+        self._changed_files = set()
+        self._rescan = False
+        _LOGGER.debug(
+            f"::watcher:: Changed files: {'unknown' if changed_files is None else sorted(changed_files)}"
+        )
+        await self._on_change(changed_files)
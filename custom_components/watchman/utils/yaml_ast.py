@@ -0,0 +1,108 @@
+"""Extractor of entity and action references from the YAML document tree."""
+
+import re
+import time
+
+import yaml
+from yaml.nodes import MappingNode, ScalarNode, SequenceNode
+
+from .scanner import SCANNER
+from ..const import PARSER_STOP_WORDS
+
+# C-accelerated loader is used when PyYAML is built with libyaml
+Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# keys which values are actions, all other keys may hold entities
+SERVICE_KEYS = frozenset(["service", "action"])
+SERVICE_ID = re.compile(r"[A-Za-z_0-9]*\.[A-Za-z_0-9]+")
+STOP_KEYS = frozenset(PARSER_STOP_WORDS)
+# values with custom tags like `!secret` are not references
+STANDARD_TAG = "tag:yaml.org,2002:"
+
+
+def parse_yaml_ast(text, deadline=None, scanner=SCANNER):
+    """Return entities and actions found in YAML documents with their line numbers.
+
+    Documents are composed to a node tree without constructing Python objects,
+    so HA specific tags (`!include`, `!secret`, `!input`...) do not need
+    constructors. A reference is a whole scalar value (or a comma-separated
+    list of them) or a mapping key, templates are scanned as text. Values of
+    `service`/`action` keys are actions only, values of stop word keys (e.g.
+    `description`) and tagged values are never treated as references.
+    Raise yaml.YAMLError if text is not a valid YAML and TimeoutError if it is
+    not parsed by deadline, a time.monotonic() value. Templates are scanned
+    with the given scanner.
+    """
+    entities = {}
+    services = {}
+    loader = Loader(text)
+    try:
+        while loader.check_node():
+            if deadline and time.monotonic() > deadline:
+                raise TimeoutError
+            walk(loader.get_node(), None, entities, services, set(), deadline, scanner)
+    finally:
+        loader.dispose()
+    return entities, services
+
+
+def walk(node, key, entities, services, parents, deadline=None, scanner=SCANNER):
+    """Collect references from a node found under key."""
+    if isinstance(node, ScalarNode):
+        if node.tag.startswith(STANDARD_TAG):
+            add_scalar(node, key, entities, services, scanner)
+        return
+    if id(node) in parents:
+        # recursive alias
+        return
+    parents.add(id(node))
+    if deadline and time.monotonic() > deadline:
+        raise TimeoutError
+    if isinstance(node, MappingNode):
+        for key_node, value_node in node.value:
+            child_key = None
+            if isinstance(key_node, ScalarNode):
+                child_key = key_node.value
+                add_scalar(key_node, None, entities, services, scanner)
+            if child_key not in STOP_KEYS:
+                walk(
+                    value_node,
+                    child_key,
+                    entities,
+                    services,
+                    parents,
+                    deadline,
+                    scanner,
+                )
+    elif isinstance(node, SequenceNode):
+        for child in node.value:
+            walk(child, key, entities, services, parents, deadline, scanner)
+    parents.discard(id(node))
+
+
+def add_scalar(node, key, entities, services, scanner=SCANNER):
+    """Add references found in a scalar value."""
+    value = node.value
+    if "." not in value:
+        return
+    lineno = node.start_mark.line + 1
+    if key in SERVICE_KEYS:
+        if SERVICE_ID.fullmatch(value.strip()):
+            services.setdefault(value.strip(), []).append(lineno)
+        return
+    if "{" in value:
+        # lines of a literal block template follow the line of its indicator
+        offset = lineno if node.style == "|" else None
+        template_entities, template_services = scanner.scan(value)
+        for found, template_refs in (
+            (entities, template_entities),
+            (services, template_services),
+        ):
+            for ref, lines in template_refs.items():
+                found.setdefault(ref, []).extend(
+                    [offset + line for line in lines] if offset else [lineno]
+                )
+        return
+    for item in value.split(","):
+        if scanner.is_entity(item := item.strip()):
+            entities.setdefault(item, []).append(lineno)
@@ -8,6 +8,7 @@ from custom_components.watchman.const import (
     CONF_HEADER,
     CONF_SECTION_APPEARANCE_LOCATION,
     DOMAIN,
+    HASS_DATA_PARSED_ENTITY_LIST,
 )
 
 from . import async_init_integration
@@ -129,3 +130,38 @@ async def test_notification_action_no_action(hass):
             blocking=True,
         )
     await hass.async_block_till_done()
+
+
+async def test_preview_ignores_action(hass):
+    """Test previewing ignore rules against the last parse results."""
+    await async_init_integration(hass)
+    await hass.async_block_till_done()
+    response = await hass.services.async_call(
+        DOMAIN,
+        "preview_ignores",
+        {
+            "ignored_items": "sensor.test1_*, fake.*",
+            "ignored_files": "*/test_services.yaml",
+        },
+        blocking=True,
+        return_response=True,
+    )
+    assert response["ignored_items"] == [
+        {
+            "rule": "sensor.test1_*",
+            "entities": 1,
+            "actions": 0,
+            "samples": ["sensor.test1_unknown"],
+        },
+        {
+            "rule": "fake.*",
+            "entities": 0,
+            "actions": 2,
+            "samples": ["fake.service1", "fake.service2"],
+        },
+    ]
+    assert response["ignored_files"][0]["files"] == 1
+    assert response["ignored_files"][0]["samples"][0].endswith("test_services.yaml")
+    assert (response["entities"], response["actions"], response["files"]) == (1, 2, 1)
+    # live configuration is not changed
+    assert len(hass.data[DOMAIN][HASS_DATA_PARSED_ENTITY_LIST]) == 4
@@ -0,0 +1,33 @@
+"""Test estimate of the parsing cost."""
+
+from custom_components.watchman.utils.estimate import estimate_scan
+from custom_components.watchman.utils.scanner import SCANNER
+
+
+def test_estimate_scan(tmp_path):
+    """Files are counted and sized the same way the parser walks them."""
+    (tmp_path / "packages").mkdir()
+    (tmp_path / "configuration.yaml").write_text("light: light.test1_unknown\n")
+    (tmp_path / "packages" / "lights.yaml").write_text("light: light.test2_unknown\n")
+    (tmp_path / "packages" / "ignored.yaml").write_text("light: light.test3\n")
+    (tmp_path / "huge.yaml").write_text("light: light.test4_unknown\n" * 100)
+    (tmp_path / "notes.txt").write_text("light.test5\n")
+
+    estimate = estimate_scan(
+        [(str(tmp_path), "**/*.yaml")], ["*/ignored.yaml"], False, 1024
+    )
+
+    assert estimate.files == 2
+    assert estimate.size == 54
+    assert estimate.skipped == 1
+    assert estimate.duration > 0
+
+
+def test_estimate_own_scanner(tmp_path):
+    """Sample files do not go through the line memo of the parser."""
+    (tmp_path / "configuration.yaml").write_text("light: light.test1_unknown\n")
+    memo_info = SCANNER.memo_info()
+
+    estimate_scan([(str(tmp_path), "**/*.yaml")], None, False, 0)
+
+    assert SCANNER.memo_info() == memo_info
@@ -0,0 +1,63 @@
+"""Test extractor registry."""
+
+from custom_components.watchman.const import CONF_CHECK_LOVELACE, CONF_INCLUDED_FOLDERS
+from custom_components.watchman.utils.extractors import (
+    Extractor,
+    EXTRACTORS,
+    get_extractor,
+    register_extractor,
+)
+from custom_components.watchman.utils.parser import get_included_folders
+
+
+def test_extractor_by_path():
+    """Each file goes to the extractor registered for its type."""
+    assert get_extractor("/config/packages/lights.yaml").name == "yaml"
+    assert get_extractor("/config/lights.yml").name == "yaml"
+    assert get_extractor("/config/.storage/lovelace.dashboard_test").name == "lovelace"
+    assert get_extractor("/config/custom_templates/tools.jinja").name == "jinja"
+    assert get_extractor("/config/notes.txt").name == "text"
+
+
+def test_jinja_extractor():
+    """Custom templates are scanned as text and never include files."""
+    entities, services, includes = get_extractor(
+        "/config/custom_templates/tools.jinja"
+    ).extract(
+        "/config/custom_templates/tools.jinja",
+        "{% macro t() %}{{ states('sensor.test1_unknown') }}{% endmacro %}\n"
+        "{# !include secrets.yaml #}\n",
+        True,
+        None,
+    )
+    assert entities == {"sensor.test1_unknown": [1]}
+    assert services == {}
+    assert includes == []
+
+
+def test_register_extractor():
+    """Extractors registered later take precedence."""
+    extractor = Extractor(
+        "blueprint", lambda path, text, yaml_ast, deadline: ({}, {}, [])
+    )
+    register_extractor(extractor, ["*/blueprints/*.yaml"])
+    try:
+        assert get_extractor("/config/blueprints/automation/x.yaml") is extractor
+        assert get_extractor("/config/automations.yaml").name == "yaml"
+    finally:
+        EXTRACTORS.pop(0)
+
+
+def test_custom_templates_included(hass):
+    """Custom templates are parsed only if their folder is included."""
+    config_dir = hass.config.config_dir
+    templates = (config_dir, "custom_templates/**/*.jinja")
+    for folders, parsed in [
+        (config_dir, True),
+        (f"{config_dir}/, /media", True),
+        (f"{config_dir}/custom_templates", True),
+        (f"{config_dir}/packages", False),
+        (f"{config_dir}_old", False),
+    ]:
+        options = {CONF_INCLUDED_FOLDERS: folders, CONF_CHECK_LOVELACE: False}
+        assert (templates in get_included_folders(hass, options)) == parsed, folders
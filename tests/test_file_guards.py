@@ -0,0 +1,45 @@
+"""Test guards for huge, binary and slow files."""
+
+from custom_components.watchman.utils.parse_cache import ParseCache
+from custom_components.watchman.utils.parser import parse, parse_file
+
+
+def test_large_file_skipped(tmp_path):
+    """Files larger than the limit are not read."""
+    path = tmp_path / "export.yaml"
+    path.write_text("light: light.test1_unknown\n" * 100)
+    result = parse_file(str(path), max_file_size=1024)
+    assert result["skipped"] == "larger than 1 KiB"
+    assert result["entities"] == {}
+    assert parse_file(str(path))["entities"]["light.test1_unknown"][:2] == [1, 2]
+
+
+def test_binary_file_skipped(tmp_path):
+    """Files with NUL bytes are skipped as binary."""
+    path = tmp_path / "image.yaml"
+    path.write_bytes(b"light: light.test1_unknown\n\0\x89PNG")
+    result = parse_file(str(path))
+    assert result["skipped"] == "binary content"
+    assert result["entities"] == {}
+
+
+def test_slow_file_skipped(tmp_path):
+    """Parsing is aborted once the time budget is spent."""
+    path = tmp_path / "generated.yaml"
+    path.write_text("light: light.test1_unknown\n" * 5000)
+    result = parse_file(str(path), time_budget=1e-9)
+    assert result["skipped"] == "not parsed in 1e-09s"
+    assert parse_file(str(path), yaml_ast=True, time_budget=1e-9)["skipped"]
+
+
+async def test_slow_file_parsed_again(hass, tmp_path):
+    """Time budget skips depend on load, so they are not cached."""
+    path = tmp_path / "generated.yaml"
+    path.write_text("light: light.test1_unknown\n" * 5000)
+    folders = [(str(tmp_path), "**/*.yaml")]
+    cache = ParseCache(hass)
+    result = await parse(hass, folders, None, str(tmp_path), cache, time_budget=1e-9)
+    assert result[7] == [("generated.yaml", "not parsed in 1e-09s")]
+
+    await parse(hass, folders, None, str(tmp_path), cache, time_budget=1e-9)
+    assert (cache.hits, cache.misses) == (0, 1)
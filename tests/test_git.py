@@ -0,0 +1,48 @@
+"""Test git-aware change detection."""
+
+import shutil
+import subprocess
+
+import pytest
+
+from custom_components.watchman.utils.git import get_changed_files, get_git_state
+from custom_components.watchman.utils.utils import scan_files
+
+
+def git(path, *args):
+    """Run git command in the test repository."""
+    subprocess.run(
+        ["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+        cwd=path,
+        check=True,
+        capture_output=True,
+    )
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+def test_git_changed_files(tmp_path):
+    """Changed files are taken from git status and commits between scans."""
+    (tmp_path / ".storage").mkdir()
+    (tmp_path / ".gitignore").write_text(".storage/\n")
+    (tmp_path / "configuration.yaml").write_text("light: light.test1_unknown\n")
+    (tmp_path / "scripts.yaml").write_text("light: light.test2_unknown\n")
+    (tmp_path / ".storage" / "lovelace").write_text("{}")
+    git(tmp_path, "init", "-q")
+    git(tmp_path, "add", "-A")
+    git(tmp_path, "commit", "-q", "-m", "initial")
+    folders = [(str(tmp_path), "**/*.yaml"), (str(tmp_path), ".storage/**/lovelace*")]
+    scanned = scan_files(folders, None)
+    previous = get_git_state(str(tmp_path))
+
+    (tmp_path / "scripts.yaml").write_text("light: light.test3_unknown\n")
+    git(tmp_path, "commit", "-q", "-am", "scripts")
+    (tmp_path / "automations.yaml").write_text("light: light.test4_unknown\n")
+    current = get_git_state(str(tmp_path))
+
+    assert get_changed_files(previous, current, folders, None, scanned) == {
+        str(tmp_path / "scripts.yaml"),
+        str(tmp_path / "automations.yaml"),
+        str(tmp_path / ".storage" / "lovelace"),
+    }
+    assert get_changed_files(None, current, folders, None, scanned) is None
+    assert get_git_state(str(tmp_path.parent / "not_a_repository")) is None
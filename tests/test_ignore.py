@@ -0,0 +1,52 @@
+"""Test matcher of ignored items rules."""
+
+import fnmatch
+import random
+
+from custom_components.watchman.utils.ignore import IgnoreMatcher
+
+ITEMS = [
+    "sensor.test1",
+    "sensor.test2_unknown",
+    "light.test1",
+    "light.living_room",
+    "timer.finished",
+    "event.button",
+    "script.turn_on",
+    "input_boolean.x",
+]
+
+
+def test_ignore_matcher_rules():
+    """Exact, prefix and wildcard rules match like fnmatch does."""
+    matcher = IgnoreMatcher(
+        ["sensor.test1", "light.*", "timer.finished", "*.turn_?n", "", "[ei]*.x"]
+    )
+    assert matcher.filter(ITEMS) == [
+        "sensor.test1",
+        "light.test1",
+        "light.living_room",
+        "timer.finished",
+        "script.turn_on",
+        "input_boolean.x",
+    ]
+    assert IgnoreMatcher(["*"]).filter(ITEMS) == ITEMS
+    assert IgnoreMatcher([]).filter(ITEMS) == []
+
+
+def test_ignore_matcher_random_rules():
+    """Matcher agrees with fnmatch for generated rules."""
+    rnd = random.Random(42)
+    chars = ["s", "e", "n", ".", "_", "1", "*", "?", "[se]", "sensor", "light"]
+    items = [*ITEMS, "sensor.", "s", "sensor.e1", "light.se"]
+    for _ in range(2000):
+        rules = [
+            "".join(rnd.choice(chars) for _ in range(rnd.randint(0, 6)))
+            for _ in range(rnd.randint(0, 4))
+        ]
+        expected = [
+            item
+            for item in items
+            if any(rule and fnmatch.fnmatchcase(item, rule) for rule in rules)
+        ]
+        assert IgnoreMatcher(rules).filter(items) == expected, rules
@@ -0,0 +1,40 @@
+"""Test include graph of configuration files."""
+
+from custom_components.watchman.utils.includes import find_includes, resolve_includes
+
+CONFIG = """
+homeassistant:
+  packages: !include_dir_named packages
+# old: !include old.yaml
+sensor: !include 'sensors.yaml'
+"""
+
+KNOWN_FILES = {
+    "/config/configuration.yaml",
+    "/config/sensors.yaml",
+    "/config/old.yaml",
+    "/config/packages/lights.yaml",
+    "/config/packages/deep/switches.yaml",
+    "/config/packages/.archive/lights.yaml",
+    "/config/packages/secrets.yaml",
+}
+
+
+def test_find_includes():
+    """Commented out includes are not followed."""
+    assert find_includes(CONFIG) == [
+        ["!include_dir_named", "packages"],
+        ["!include", "sensors.yaml"],
+    ]
+
+
+def test_resolve_includes():
+    """Included folders bring their yaml files except hidden ones and secrets."""
+    included = resolve_includes(
+        "/config/configuration.yaml", find_includes(CONFIG), KNOWN_FILES
+    )
+    assert sorted(included) == [
+        "/config/packages/deep/switches.yaml",
+        "/config/packages/lights.yaml",
+        "/config/sensors.yaml",
+    ]
@@ -0,0 +1,87 @@
+"""Test occurrence index."""
+
+from custom_components.watchman.utils.index import OccurrenceIndex
+from custom_components.watchman.utils.report import fill
+
+
+def test_index_keeps_all_files():
+    """Occurrences of an entry are kept for every file."""
+    index = OccurrenceIndex()
+    index.add("sensor.test1_unknown", "sensors.yaml", 3)
+    index.add("sensor.test2_missing", "sensors.yaml", 4)
+    index.add("sensor.test1_unknown", "automations.yaml", 12)
+    index.add("sensor.test1_unknown", "sensors.yaml", 7)
+    index.add("sensor.test1_unknown", ".storage/lovelace", "views[0].cards[1].entity")
+    assert len(index) == 2
+    assert "sensor.test1_unknown" in index
+    assert list(index) == ["sensor.test1_unknown", "sensor.test2_missing"]
+    assert index["sensor.test1_unknown"] == {
+        "sensors.yaml": [3, 7],
+        "automations.yaml": [12],
+        ".storage/lovelace": ["views[0].cards[1].entity"],
+    }
+    assert fill(index["sensor.test1_unknown"], 0) == (
+        "sensors.yaml:3,7 automations.yaml:12 .storage/lovelace:views[0].cards[1].entity"
+    )
+
+
+def test_index_discard_size():
+    """Discarded entries do not count in the index size."""
+    index = OccurrenceIndex(max_occurrences=1)
+    index.add("sensor.test1_unknown", "sensors.yaml", 3)
+    size = index.nbytes
+    index.add("sensor.test2_missing", "sensors.yaml", 4)
+    index.add("sensor.test2_missing", "sensors.yaml", 5)
+    assert index.nbytes > size
+    index.discard("sensor.test2_missing")
+    assert index.nbytes == size
+    index.discard("sensor.test2_missing")
+    assert index.nbytes == size
+
+
+def test_index_copy_update_discard():
+    """Merged copy does not change the original index."""
+    index = OccurrenceIndex()
+    index.add("sensor.test1_unknown", "sensors.yaml", 3)
+    loaded = OccurrenceIndex()
+    loaded.add("sensor.test1_unknown", "automation", "1718")
+    merged = index.copy()
+    merged.update(loaded)
+    merged.discard("sensor.test2_missing")
+    assert merged["sensor.test1_unknown"] == {
+        "sensors.yaml": [3],
+        "automation": ["1718"],
+    }
+    assert index["sensor.test1_unknown"] == {"sensors.yaml": [3]}
+    merged.discard("sensor.test1_unknown")
+    assert "sensor.test1_unknown" not in merged
+
+
+def test_index_summarizes_occurrences():
+    """Occurrences past the cap are counted per file."""
+    index = OccurrenceIndex(max_occurrences=3)
+    for line in range(1, 6):
+        index.add("sensor.test1_unknown", "sensors.yaml", line)
+    index.add("sensor.test1_unknown", "automations.yaml", 12)
+    assert index.summarized == 1
+    assert index["sensor.test1_unknown"] == {
+        "sensors.yaml": [1, 2, 3, "+2"],
+        "automations.yaml": ["+1"],
+    }
+    assert fill(index["sensor.test1_unknown"], 0) == (
+        "sensors.yaml:1,2,3,+2 automations.yaml:+1"
+    )
+    merged = OccurrenceIndex().copy()
+    merged.update(index)
+    assert merged["sensor.test1_unknown"] == index["sensor.test1_unknown"]
+
+
+def test_index_memory_budget():
+    """Only the first occurrence of a reference is kept over the budget."""
+    index = OccurrenceIndex(memory_budget=4096)
+    for line in range(1, 1001):
+        index.add(f"sensor.test{line}", "sensors.yaml", line)
+        index.add(f"sensor.test{line}", "sensors.yaml", line + 1)
+    assert index["sensor.test1"] == {"sensors.yaml": [1, 2]}
+    assert index["sensor.test1000"] == {"sensors.yaml": [1000, "+1"]}
+    assert index.summarized > 0
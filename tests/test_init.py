@@ -1,5 +1,7 @@
 """Test setup process."""
 
+from unittest.mock import patch
+
 from homeassistant.setup import async_setup_component
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers import entity_registry as er
@@ -8,6 +10,7 @@ from . import async_init_integration
 from custom_components.watchman.const import (
     CONF_IGNORED_ITEMS,
     CONF_IGNORED_STATES,
+    CONF_IGNORED_REGISTRY,
     DOMAIN,
     CONF_IGNORED_FILES,
     HASS_DATA_MISSING_ENTITIES,
@@ -97,3 +100,52 @@ async def test_ignored_items(hass):
     assert len(hass.data[DOMAIN][HASS_DATA_PARSED_SERVICE_LIST]) == 2
     assert len(hass.data[DOMAIN][HASS_DATA_MISSING_ENTITIES]) == 2
     assert len(hass.data[DOMAIN][HASS_DATA_MISSING_SERVICES]) == 2
+
+
+async def test_ignored_registry(hass, entity_registry: er.EntityRegistry):
+    """Entities are ignored by their integration and labels."""
+    # registered before their states are set, so that ids do not clash
+    entity_registry.async_get_or_create(
+        "sensor", "zha", "test1", suggested_object_id="test1_unknown"
+    )
+    entity_registry.async_get_or_create(
+        "sensor", "mqtt", "test3", suggested_object_id="test3_unavail"
+    )
+    hass.states.async_set("sensor.test1_unknown", "unknown")
+    hass.states.async_set("sensor.test2_missing", "missing")
+    hass.states.async_set("sensor.test3_unavail", "unavailable")
+    hass.states.async_set("sensor.test4_avail", "42")
+    await async_init_integration(
+        hass, add_params={CONF_IGNORED_REGISTRY: "integration:zha, label:Battery"}
+    )
+    assert len(hass.data[DOMAIN][HASS_DATA_MISSING_ENTITIES]) == 2
+
+    # labels added later are applied on the registry update event
+    entity_registry.async_update_entity("sensor.test3_unavail", labels={"battery"})
+    await hass.async_block_till_done()
+    assert len(hass.data[DOMAIN][HASS_DATA_MISSING_ENTITIES]) == 1
+
+
+async def test_options_applied_in_place(hass):
+    """Ignored items and states are applied without parsing files again."""
+    hass.states.async_set("sensor.test1_unknown", "unknown")
+    hass.states.async_set("sensor.test2_missing", "missing")
+    hass.states.async_set("sensor.test3_unavail", "unavailable")
+    hass.states.async_set("sensor.test4_avail", "42")
+    entry = await async_init_integration(hass)
+    assert len(hass.data[DOMAIN][HASS_DATA_MISSING_ENTITIES]) == 3
+
+    with patch("custom_components.watchman.coordinator.parse_config") as parse_config:
+        hass.config_entries.async_update_entry(
+            entry,
+            data={
+                **entry.data,
+                CONF_IGNORED_ITEMS: "sensor.test1_*",
+                CONF_IGNORED_STATES: ["missing"],
+            },
+        )
+        await hass.async_block_till_done()
+
+    parse_config.assert_not_called()
+    assert len(hass.data[DOMAIN][HASS_DATA_PARSED_ENTITY_LIST]) == 3
+    assert len(hass.data[DOMAIN][HASS_DATA_MISSING_ENTITIES]) == 1
@@ -0,0 +1,96 @@
+"""Test references of automations loaded to memory."""
+
+from homeassistant.setup import async_setup_component
+
+from custom_components.watchman.const import (
+    CONF_IGNORED_FILES,
+    CONF_INCLUDED_FOLDERS,
+    DEFAULT_OPTIONS,
+    DOMAIN,
+    HASS_DATA_PARSED_ENTITY_LIST,
+    HASS_DATA_PARSED_SERVICE_LIST,
+)
+from custom_components.watchman.utils.loaded_config import collect_loaded_config
+
+from . import async_init_integration
+
+
+AUTOMATION_CONFIG = {
+    "automation": [
+        {
+            "id": "1718",
+            "trigger": {"platform": "event", "event_type": "test_event"},
+            "action": {
+                "service": "light.turn_on",
+                "target": {"entity_id": "light.test5_unknown"},
+            },
+        }
+    ]
+}
+
+
+def included_folders(hass):
+    """Return test configuration folder with the config directory."""
+    return f"/workspaces/thewatchman/tests/input, {hass.config.config_dir}"
+
+
+async def test_loaded_automations(hass):
+    """Automation references are reported with the automation id."""
+    assert await async_setup_component(hass, "automation", AUTOMATION_CONFIG)
+    await async_init_integration(
+        hass, add_params={CONF_INCLUDED_FOLDERS: included_folders(hass)}
+    )
+    entity_list = hass.data[DOMAIN][HASS_DATA_PARSED_ENTITY_LIST]
+    service_list = hass.data[DOMAIN][HASS_DATA_PARSED_SERVICE_LIST]
+    assert entity_list["light.test5_unknown"] == {"automation": ["1718"]}
+    assert service_list["light.turn_on"] == {"automation": ["1718"]}
+    # references from configuration files are still there
+    assert "sensor.test1_unknown" in entity_list
+
+
+async def test_loaded_automations_ignored(hass):
+    """Automations are not reported if automations.yaml is ignored or not included."""
+    assert await async_setup_component(hass, "automation", AUTOMATION_CONFIG)
+    await async_init_integration(
+        hass,
+        add_params={
+            CONF_INCLUDED_FOLDERS: included_folders(hass),
+            # default rules are kept, e.g. blueprints of the config directory
+            CONF_IGNORED_FILES: (
+                f"{DEFAULT_OPTIONS[CONF_IGNORED_FILES]}, */automations.yaml"
+            ),
+        },
+    )
+    entity_list = hass.data[DOMAIN][HASS_DATA_PARSED_ENTITY_LIST]
+    service_list = hass.data[DOMAIN][HASS_DATA_PARSED_SERVICE_LIST]
+    assert "light.test5_unknown" not in entity_list
+    assert (
+        "light.turn_on" not in service_list
+        or "automation" not in service_list["light.turn_on"]
+    )
+
+    # config directory is not an included folder
+    _, _, skipped_files, _ = collect_loaded_config(
+        hass, [("/workspaces/thewatchman/tests/input", "**/*.yaml")], None
+    )
+    assert not skipped_files
+
+
+async def test_loaded_scenes_without_id(hass):
+    """scenes.yaml is parsed as a file if some scene has no id."""
+    assert await async_setup_component(
+        hass,
+        "scene",
+        {
+            "scene": [
+                {"id": "1719", "name": "ui", "entities": {"light.test6": "on"}},
+                {"name": "handwritten", "entities": {"light.test7": "on"}},
+            ]
+        },
+    )
+    await hass.async_block_till_done()
+    entities, _, skipped_files, _ = collect_loaded_config(
+        hass, [(hass.config.config_dir, "**/*.yaml")], None
+    )
+    assert hass.config.path("scenes.yaml") not in skipped_files
+    assert "light.test6" not in entities
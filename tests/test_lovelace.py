@@ -0,0 +1,80 @@
+"""Test extractor of Lovelace dashboards."""
+
+import json
+
+from custom_components.watchman.utils.lovelace import (
+    is_lovelace_storage,
+    parse_lovelace,
+)
+
+DASHBOARD = {
+    "version": 1,
+    "minor_version": 1,
+    "key": "lovelace.dashboard_test",
+    "data": {
+        "config": {
+            "views": [
+                {
+                    "cards": [
+                        {
+                            "type": "entities",
+                            "entities": [
+                                "sensor.test1_unknown",
+                                {
+                                    "entity": "light.test1_unknown",
+                                    "tap_action": {
+                                        "action": "call-service",
+                                        "service": "light.toggle",
+                                        "target": {
+                                            "entity_id": "light.test1_unknown, switch.test1_unknown"
+                                        },
+                                    },
+                                },
+                            ],
+                        },
+                        {
+                            "type": "markdown",
+                            "content": "{{ states('sensor.test2_unknown') }}",
+                        },
+                        {
+                            "type": "button",
+                            "name": "light.not_an_entity",
+                            "entity": "light.wildcard_*",
+                        },
+                    ]
+                }
+            ]
+        }
+    },
+}
+
+
+def test_lovelace_json_paths():
+    """Dashboard references are reported with their JSON paths."""
+    entities, services = parse_lovelace(json.dumps(DASHBOARD, indent=2))
+    assert entities == {
+        "sensor.test1_unknown": ["views[0].cards[0].entities[0]"],
+        "light.test1_unknown": [
+            "views[0].cards[0].entities[1].entity",
+            "views[0].cards[0].entities[1].tap_action.target.entity_id",
+        ],
+        "switch.test1_unknown": [
+            "views[0].cards[0].entities[1].tap_action.target.entity_id"
+        ],
+        "sensor.test2_unknown": ["views[0].cards[1].content"],
+    }
+    assert services == {
+        "light.toggle": ["views[0].cards[0].entities[1].tap_action.service"]
+    }
+
+
+def test_lovelace_invalid_json():
+    """Dashboard which is not a valid JSON is scanned as text."""
+    entities, _ = parse_lovelace('{"entity": "sensor.test1_unknown",\n')
+    assert entities == {"sensor.test1_unknown": [1]}
+
+
+def test_lovelace_storage_path():
+    """Only dashboards in .storage folder are parsed as JSON."""
+    assert is_lovelace_storage("/config/.storage/lovelace.dashboard_test")
+    assert not is_lovelace_storage("/config/dashboards/lovelace.yaml")
@@ -0,0 +1,110 @@
+"""Test persistent cache of per-file parse results."""
+
+import os
+
+from custom_components.watchman.const import (
+    PARSE_CACHE_STORAGE_KEY,
+    PARSE_CACHE_STORAGE_VERSION,
+)
+from custom_components.watchman.utils.parse_cache import ParseCache
+from custom_components.watchman.utils.parser import parse
+
+
+async def async_parse(hass, tmp_path, cache):
+    """Parse yaml files of tmp_path with the cache."""
+    return await parse(hass, [(str(tmp_path), "**/*.yaml")], None, str(tmp_path), cache)
+
+
+async def test_unchanged_file_reused(hass, tmp_path):
+    """Files with the same signature are taken from the cache."""
+    (tmp_path / "lights.yaml").write_text("light: light.test1_unknown\n")
+    (tmp_path / "sensors.yaml").write_text("sensor: sensor.test2_missing\n")
+    cache = ParseCache(hass)
+    await async_parse(hass, tmp_path, cache)
+    assert (cache.hits, cache.misses) == (0, 2)
+
+    result = await async_parse(hass, tmp_path, cache)
+    assert (cache.hits, cache.misses) == (2, 0)
+    assert result[0]["light.test1_unknown"] == {"lights.yaml": [1]}
+
+
+async def test_changed_file_parsed_again(hass, tmp_path):
+    """Changed content is extracted again, a touched file keeps its result."""
+    path = tmp_path / "lights.yaml"
+    path.write_text("light: light.test1_unknown\n")
+    cache = ParseCache(hass)
+    await async_parse(hass, tmp_path, cache)
+
+    path.write_text("light: light.test5_unknown_changed\n")
+    result = await async_parse(hass, tmp_path, cache)
+    assert cache.misses == 1
+    assert list(result[0]) == ["light.test5_unknown_changed"]
+
+    # same content with a new mtime is read, but the cached result is reused
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    digest = cache.get_digest(str(path))
+    result = await async_parse(hass, tmp_path, cache)
+    assert cache.misses == 1
+    assert cache.get_digest(str(path)) == digest
+    assert list(result[0]) == ["light.test5_unknown_changed"]
+    result = await async_parse(hass, tmp_path, cache)
+    assert (cache.hits, cache.misses) == (1, 0)
+
+
+async def test_removed_file_pruned(hass, tmp_path):
+    """Removed files are dropped from the cache."""
+    path = tmp_path / "lights.yaml"
+    path.write_text("light: light.test1_unknown\n")
+    (tmp_path / "sensors.yaml").write_text("sensor: sensor.test2_missing\n")
+    cache = ParseCache(hass)
+    await async_parse(hass, tmp_path, cache)
+    assert cache.get_digest(str(path))
+
+    path.unlink()
+    result = await async_parse(hass, tmp_path, cache)
+    assert cache.get_digest(str(path)) is None
+    assert "light.test1_unknown" not in result[0]
+
+
+async def test_decode_error_cached(hass, tmp_path):
+    """Files which are not UTF-8 are not parsed again until they change."""
+    path = tmp_path / "latin.yaml"
+    path.write_bytes("light: light.caf\xe9\n".encode("latin-1"))
+    cache = ParseCache(hass)
+    result = await async_parse(hass, tmp_path, cache)
+    assert result[2] == 0
+    await async_parse(hass, tmp_path, cache)
+    assert (cache.hits, cache.misses) == (1, 0)
+
+    path.write_text("light: light.test1_unknown\n")
+    result = await async_parse(hass, tmp_path, cache)
+    assert cache.misses == 1
+    assert result[2] == 1
+
+
+async def test_old_version_discarded(hass, hass_storage):
+    """Cache stored by another parser version is dropped on load."""
+    hass_storage[PARSE_CACHE_STORAGE_KEY] = {
+        "version": PARSE_CACHE_STORAGE_VERSION - 1,
+        "minor_version": 1,
+        "key": PARSE_CACHE_STORAGE_KEY,
+        "data": {
+            "mode": "text",
+            "files": {
+                "/config/lights.yaml": {
+                    "signature": [1, 2, 3, 4],
+                    "entities": {"light.test1_unknown": [1]},
+                    "services": {},
+                    "error": None,
+                    "digest": "0123",
+                    "includes": [],
+                    "skipped": None,
+                }
+            },
+        },
+    }
+    cache = ParseCache(hass)
+    await cache.async_load()
+    assert cache.get("/config/lights.yaml", [1, 2, 3, 4]) is None
+    assert cache.get_digest("/config/lights.yaml") is None
@@ -0,0 +1,50 @@
+"""Test whole-file parsing against per-line scanning."""
+
+from custom_components.watchman.const import PARSER_MMAP_THRESHOLD
+from custom_components.watchman.utils.parser import parse_file
+from custom_components.watchman.utils.scanner import SCANNER
+
+LINES = [
+    "automation:",
+    "  - alias: test",
+    "    action:",
+    "      - service: light.turn_on",
+    "        entity_id: light.test1_unknown # sensor.test2_missing",
+    "      - action: script.test3  # comment",
+    "    description: sensor.test4_avail",
+    "    value_template: '{{ states.sensor.test5_unknown }}'",
+]
+
+
+def line_scan(lines):
+    """Extract references of every line separately, numbering lines from 1."""
+    entities = {}
+    services = {}
+    for lineno, line in enumerate(lines, 1):
+        line_entities, line_services = SCANNER.scan(line)
+        for entity in line_entities:
+            entities.setdefault(entity, []).append(lineno)
+        for service in line_services:
+            services.setdefault(service, []).append(lineno)
+    return entities, services
+
+
+def test_parse_mmap_file(tmp_path):
+    """Memory-mapped files have the same references as scanned lines."""
+    lines = LINES * (PARSER_MMAP_THRESHOLD // len("\n".join(LINES)) + 1)
+    path = tmp_path / "large.yaml"
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    assert path.stat().st_size >= PARSER_MMAP_THRESHOLD
+
+    result = parse_file(str(path))
+    assert (result["entities"], result["services"]) == line_scan(lines)
+
+
+def test_parse_line_breaks(tmp_path):
+    """CRLF and CR line breaks give the same line numbers as LF."""
+    expected = line_scan(LINES)
+    for line_break in ("\n", "\r\n", "\r"):
+        path = tmp_path / "breaks.yaml"
+        path.write_bytes((line_break.join(LINES) + line_break).encode("utf-8"))
+        result = parse_file(str(path))
+        assert (result["entities"], result["services"]) == expected, repr(line_break)
@@ -0,0 +1,47 @@
+"""Test background rescans of parsed files."""
+
+from datetime import timedelta
+import os
+
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.watchman.const import (
+    DOMAIN,
+    HASS_DATA_SCANNED_FILES,
+    RESCAN_MIN_INTERVAL,
+    RESCAN_TICK,
+)
+from custom_components.watchman.coordinator import WatchmanCoordinator
+from custom_components.watchman.utils.utils import scan_files
+
+
+async def test_rescan_reports_modified_files(hass, tmp_path, freezer):
+    """Hot files are checked first and only modified files are reported."""
+    (tmp_path / "automations.yaml").write_text("light: light.test1_unknown\n")
+    (tmp_path / "packages.yaml").write_text("light: light.test2_unknown\n")
+    hass.data[DOMAIN] = {
+        HASS_DATA_SCANNED_FILES: scan_files([(str(tmp_path), "**/*.yaml")], None)
+    }
+    reported = []
+
+    async def async_on_change(changed_files):
+        reported.append(changed_files)
+
+    coordinator = WatchmanCoordinator(hass, None, "test")
+    coordinator.async_start_rescans(async_on_change)
+    try:
+        # files are seen for the first time and get their initial interval
+        freezer.tick(timedelta(seconds=RESCAN_TICK))
+        async_fire_time_changed(hass)
+        await hass.async_block_till_done(wait_background_tasks=True)
+        (tmp_path / "automations.yaml").write_text("light: light.test3_unknown\n")
+        (tmp_path / "packages.yaml").write_text("light: light.test4_unknown\n")
+        os.utime(tmp_path / "automations.yaml", ns=(0, 0))
+        os.utime(tmp_path / "packages.yaml", ns=(0, 0))
+        freezer.tick(timedelta(seconds=RESCAN_MIN_INTERVAL + RESCAN_TICK))
+        async_fire_time_changed(hass)
+        await hass.async_block_till_done(wait_background_tasks=True)
+    finally:
+        coordinator.stop_rescans()
+
+    assert reported == [{str(tmp_path / "automations.yaml")}]
@@ -0,0 +1,70 @@
+"""Test configuration files walker."""
+
+import os
+
+from custom_components.watchman.utils.utils import (
+    is_parsed_path,
+    rescan_files,
+    scan_files,
+)
+
+
+def test_scan_files_dedupe(tmp_path):
+    """Overlapping folders, symlinks and hard links yield a file once."""
+    package = tmp_path / "packages" / "lights"
+    package.mkdir(parents=True)
+    (package / "lights.yaml").write_text("light: light.test1_unknown\n")
+    os.symlink(package, tmp_path / "packages" / "lights_link")
+    os.symlink(tmp_path / "packages", package / "loop")
+    os.link(package / "lights.yaml", tmp_path / "lights_copy.yaml")
+
+    files, _ = scan_files(
+        [(str(tmp_path), "**/*.yaml"), (str(tmp_path / "packages"), "**/*.yaml")],
+        None,
+    )
+    assert [path for path, _, _ in files] == [str(tmp_path / "lights_copy.yaml")]
+
+
+def test_rescan_changed_files(tmp_path):
+    """Only changed files are checked, the rest keep their signatures."""
+    (tmp_path / "a.yaml").write_text("light: light.test1_unknown\n")
+    (tmp_path / "b.yaml").write_text("light: light.test2_unknown\n")
+    scanned = scan_files([(str(tmp_path), "**/*.yaml")], None)
+
+    (tmp_path / "a.yaml").unlink()
+    (tmp_path / "b.yaml").write_text("light: light.test3_unknown, light.test6\n")
+    (tmp_path / "c.yaml").write_text("light: light.test4_unknown\n")
+    (tmp_path / "d.yaml").write_text("light: light.test5_unknown\n")
+    changed = {str(tmp_path / f) for f in ["a.yaml", "b.yaml", "c.yaml", "d.yaml"]}
+    changed.add(str(tmp_path / "notes.txt"))
+    files, _ = rescan_files(
+        scanned, changed, [(str(tmp_path), "**/*.yaml")], ["*/d.yaml"]
+    )
+
+    assert [(path, ignored) for path, ignored, _ in files] == [
+        (str(tmp_path / "b.yaml"), False),
+        (str(tmp_path / "c.yaml"), False),
+        (str(tmp_path / "d.yaml"), True),
+    ]
+    assert files[0][2] != scanned[0][1][2]
+
+
+def test_scan_files_skipped_folders(tmp_path):
+    """Service folders are not walked, deps only right in the included folder."""
+    for folder in [".git", "deps", "packages/deps", "packages/node_modules/x"]:
+        (tmp_path / folder).mkdir(parents=True, exist_ok=True)
+        (tmp_path / folder / "test.yaml").write_text("light: light.test1\n")
+
+    files, ignored_folders = scan_files([(str(tmp_path), "**/*.yaml")], None)
+    assert [path for path, _, _ in files] == [
+        str(tmp_path / "packages" / "deps" / "test.yaml")
+    ]
+    assert sorted(ignored_folders) == [
+        str(tmp_path / ".git"),
+        str(tmp_path / "deps"),
+        str(tmp_path / "packages" / "node_modules"),
+    ]
+    assert is_parsed_path(files[0][0], [(str(tmp_path), "**/*.yaml")], None)
+    assert not is_parsed_path(
+        str(tmp_path / "deps" / "test.yaml"), [(str(tmp_path), "**/*.yaml")], None
+    )
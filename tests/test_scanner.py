@@ -0,0 +1,84 @@
+"""Test reference scanner against former regex rules."""
+
+from pathlib import Path
+import random
+import re
+
+from homeassistant.const import Platform
+
+from custom_components.watchman.const import (
+    DEFAULT_HA_DOMAINS,
+    PARSER_LINE_MEMO_MAX_LENGTH,
+    PARSER_STOP_WORDS,
+)
+from custom_components.watchman.utils.scanner import SCANNER, ReferenceScanner
+
+ENTITY_PATTERN = re.compile(
+    r"(?:(?<=\s)|(?<=^)|(?<=\")|(?<=\'))([A-Za-z_0-9]*\s*:)?(?:\s*)?(?:states.)?"
+    rf"(({'|'.join([*Platform, *DEFAULT_HA_DOMAINS])})\.[A-Za-z_*0-9]+)"
+)
+SERVICE_PATTERN = re.compile(r"(?:service|action):\s*([A-Za-z_0-9]*\.[A-Za-z_0-9]+)")
+COMMENT_PATTERN = re.compile(rf"(^\s*(?:{'|'.join(PARSER_STOP_WORDS)}):.*)|(\s*#.*)")
+
+TOKENS = [
+    "sensor", "light", "input_boolean", "script", "states", "states.", ".",
+    " ", "  ", "\t", "\xa0", "\n", ":", "service", "action", "service:",
+    "action:", "#", "'", '"', "description", "_", "x1", "*", "yaml", "-",
+    "entity_id", "{{", "}}", "(", "é",
+]  # fmt: skip
+
+
+def regex_scan(text):
+    """Extract references line by line as the former regex parser did."""
+    entities = {}
+    services = {}
+    for lineno, line in enumerate(text.split("\n"), 1):
+        line = COMMENT_PATTERN.sub("", line)
+        for match in ENTITY_PATTERN.finditer(line):
+            typ, val = match.group(1), match.group(2)
+            if typ != "service:" and "*" not in val and not val.endswith(".yaml"):
+                entities.setdefault(val, []).append(lineno)
+        for match in SERVICE_PATTERN.finditer(line):
+            services.setdefault(match.group(1), []).append(lineno)
+    return entities, services
+
+
+def test_scanner_input_files():
+    """Scanner finds the same references as regex rules in test files."""
+    files = sorted(Path(__file__).parent.glob("input*/**/*.yaml"))
+    assert files
+    for path in files:
+        text = path.read_text(encoding="utf-8")
+        assert SCANNER.scan(text) == regex_scan(text), path
+
+
+def test_scanner_random_input():
+    """Scanner finds the same references as regex rules in generated text."""
+    rnd = random.Random(42)
+    for _ in range(5000):
+        text = "".join(rnd.choice(TOKENS) for _ in range(rnd.randint(0, 40)))
+        assert SCANNER.scan(text) == regex_scan(text), repr(text)
+
+
+def test_scanner_long_line():
+    """Scanner handles lines which make regex rules backtrack."""
+    text = "key: " + " " * 100000 + "light\n" + "sensor" * 20000 + ".\n"
+    assert SCANNER.scan(text) == ({}, {})
+
+
+def test_scanner_line_memo():
+    """Repeated lines are taken from the memo with their own line numbers."""
+    scanner = ReferenceScanner([*Platform, *DEFAULT_HA_DOMAINS], PARSER_STOP_WORDS)
+    text = "  - entity: light.test1 # light.test2\nentity: light.test1\n" * 2
+    assert scanner.scan(text) == ({"light.test1": [1, 2, 3, 4]}, {})
+    memo_info = scanner.memo_info()
+    assert (memo_info.hits, memo_info.misses) == (2, 2)
+
+
+def test_scanner_long_line_not_memoized():
+    """Long lines are scanned without the memo."""
+    scanner = ReferenceScanner([*Platform, *DEFAULT_HA_DOMAINS], PARSER_STOP_WORDS)
+    line = "entity: light.test1 " + "x" * PARSER_LINE_MEMO_MAX_LENGTH
+    assert scanner.scan(f"{line}\n{line}\n") == ({"light.test1": [1, 2]}, {})
+    memo_info = scanner.memo_info()
+    assert (memo_info.hits, memo_info.currsize) == (0, 0)
@@ -0,0 +1,88 @@
+"""Test coalescing of parse requests."""
+
+import asyncio
+from datetime import timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.watchman.const import PARSE_QUIET_WINDOW
+from custom_components.watchman.scheduler import ParseScheduler
+
+
+async def test_burst_of_requests(hass):
+    """A burst of requests is parsed once with merged reasons and files."""
+    coordinator = MagicMock(async_refresh=AsyncMock())
+    scheduler = ParseScheduler(hass, coordinator)
+    with patch(
+        "custom_components.watchman.scheduler.parse_config", AsyncMock()
+    ) as parse_config:
+        futures = [
+            scheduler.async_request("event: automation_reloaded", parse_files=False),
+            scheduler.async_request("files changed", changed_files={"/config/a.yaml"}),
+            scheduler.async_request("files changed", changed_files={"/config/b.yaml"}),
+        ]
+        await hass.async_block_till_done()
+        parse_config.assert_not_called()
+
+        async_fire_time_changed(
+            hass, dt_util.utcnow() + timedelta(seconds=PARSE_QUIET_WINDOW + 1)
+        )
+        await hass.async_block_till_done(wait_background_tasks=True)
+
+    parse_config.assert_called_once_with(
+        hass,
+        reason="event: automation_reloaded, files changed",
+        parse_files=True,
+        changed_files={"/config/a.yaml", "/config/b.yaml"},
+    )
+    coordinator.async_refresh.assert_called_once()
+    assert all(future.done() for future in futures)
+
+
+async def test_request_cancels_running_parse(hass):
+    """A request which arrives during parsing restarts it with both reasons."""
+    coordinator = MagicMock(async_refresh=AsyncMock())
+    scheduler = ParseScheduler(hass, coordinator)
+    started = asyncio.Event()
+    reasons = []
+
+    async def parse_config(hass, reason, parse_files, changed_files):  # pylint: disable=unused-argument
+        reasons.append(reason)
+        if len(reasons) == 1:
+            started.set()
+            await asyncio.Event().wait()
+
+    with patch("custom_components.watchman.scheduler.parse_config", parse_config):
+        first = scheduler.async_request("scene reload", delay=0)
+        await started.wait()
+        second = scheduler.async_request("automation reload", parse_files=False)
+        await hass.async_block_till_done()
+        assert not first.done()
+
+        async_fire_time_changed(
+            hass, dt_util.utcnow() + timedelta(seconds=PARSE_QUIET_WINDOW + 1)
+        )
+        await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert reasons == ["scene reload", "scene reload, automation reload"]
+    coordinator.async_refresh.assert_called_once()
+    assert first.done() and second.done()
+
+
+async def test_parse_error_releases_waiters(hass, caplog):
+    """A failed parse is logged and its callers stop waiting."""
+    coordinator = MagicMock(async_refresh=AsyncMock())
+    scheduler = ParseScheduler(hass, coordinator)
+    with patch(
+        "custom_components.watchman.scheduler.parse_config",
+        AsyncMock(side_effect=OSError("disk failure")),
+    ):
+        future = scheduler.async_request("files changed", delay=0)
+        async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=1))
+        await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert future.done()
+    coordinator.async_refresh.assert_not_called()
+    assert "Unable to parse configuration (files changed)" in caplog.text
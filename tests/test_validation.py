@@ -0,0 +1,39 @@
+"""Test validation of parsed references."""
+
+from homeassistant.core import callback
+from homeassistant.helpers import entity_registry as er
+
+from custom_components.watchman.const import DOMAIN, HASS_DATA_VALIDATION
+from . import async_init_integration
+
+
+async def test_validation_result(hass, entity_registry: er.EntityRegistry):
+    """States, friendly names and actions are classified in one pass."""
+
+    @callback
+    def dummy_service_handler(event):  # pylint: disable=unused-argument
+        """Test service handler."""
+
+    hass.services.async_register("fake", "service1", dummy_service_handler)
+    hass.states.async_set(
+        "sensor.test1_unknown", "unknown", {"friendly_name": "Test sensor"}
+    )
+    hass.states.async_set("sensor.test3_unavail", "unavailable")
+    hass.states.async_set("sensor.test4_avail", "42")
+    entity_registry.async_get_or_create(
+        "sensor",
+        "test",
+        "test2",
+        suggested_object_id="test2_missing",
+        disabled_by=er.RegistryEntryDisabler.USER,
+    )
+    await async_init_integration(hass)
+
+    result = hass.data[DOMAIN][HASS_DATA_VALIDATION]
+    assert result.entity_states == {
+        "sensor.test1_unknown": ("unknown", "Test sensor"),
+        "sensor.test2_missing": ("disabled", None),
+        "sensor.test3_unavail": ("unavail", None),
+    }
+    assert set(result.entities_missing) == set(result.entity_states)
+    assert set(result.services_missing) == {"fake.service2", "timer_.cancel"}
@@ -0,0 +1,38 @@
+"""Test watcher of configuration files."""
+
+import asyncio
+from datetime import timedelta
+
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.watchman.const import WATCHER_BATCH_DELAY
+from custom_components.watchman.utils.watcher import FileWatcher
+
+
+async def test_watcher_batches_changes(hass, tmp_path):
+    """Changed files are reported in a batch, ignored files are dropped."""
+    (tmp_path / "packages").mkdir()
+    reported = []
+
+    async def async_on_change(changed_files):
+        reported.append(changed_files)
+
+    watcher = FileWatcher(
+        hass, [(str(tmp_path), "**/*.yaml")], ["*/ignored.yaml"], async_on_change
+    )
+    await watcher.async_start()
+    try:
+        (tmp_path / "packages" / "lights.yaml").write_text("light: light.test1\n")
+        (tmp_path / "ignored.yaml").write_text("light: light.test2\n")
+        (tmp_path / "notes.txt").write_text("light.test3\n")
+        # let the event loop read inotify events
+        await asyncio.sleep(0.1)
+        async_fire_time_changed(
+            hass, dt_util.utcnow() + timedelta(seconds=WATCHER_BATCH_DELAY + 1)
+        )
+        await hass.async_block_till_done()
+    finally:
+        watcher.stop()
+
+    assert reported == [{str(tmp_path / "packages" / "lights.yaml")}]
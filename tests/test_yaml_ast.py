@@ -0,0 +1,53 @@
+"""Test extractor of YAML document tree."""
+
+import pytest
+import yaml
+
+from custom_components.watchman.utils.yaml_ast import parse_yaml_ast
+
+CONFIG = """
+automation:
+  - alias: "Turn on light.test1_unknown"
+    description: "should not be captured: sensor.test1_unknown"
+    trigger:
+      - platform: state
+        entity_id: binary_sensor.test1_unknown, binary_sensor.test2_unknown
+    action:
+      - service: light.turn_on
+        target:
+          entity_id:
+            - light.test2_unknown
+            - !input light_entity
+      - action: script.test1_unknown
+      - wait_template: >
+          {{ is_state('sensor.test2_unknown', 'on') }}
+      - condition: template
+        value_template: |
+          {{ true }}
+          {{ states('sensor.test3_unknown') }}
+  - !include automations/test.yaml
+homeassistant:
+  customize:
+    light.test3_unknown:
+      friendly_name: !secret light_name
+"""
+
+
+def test_yaml_ast_references():
+    """References are taken from values, keys and templates only."""
+    entities, services = parse_yaml_ast(CONFIG)
+    assert entities == {
+        "binary_sensor.test1_unknown": [7],
+        "binary_sensor.test2_unknown": [7],
+        "light.test2_unknown": [12],
+        "sensor.test2_unknown": [15],
+        "sensor.test3_unknown": [20],
+        "light.test3_unknown": [24],
+    }
+    assert services == {"light.turn_on": [9], "script.test1_unknown": [14]}
+
+
+def test_yaml_ast_invalid_yaml():
+    """Invalid YAML is reported to the caller."""
+    with pytest.raises(yaml.YAMLError):
+        parse_yaml_ast("entity_id: sensor.test1: sensor.test2")